@@ -3,7 +3,9 @@
 import streamlit as st
 import plotly.express as px
 import pandas as pd
-from backend.database import get_db_connection
+from backend.config import Config
+from backend.database import bump_data_version, get_db_connection
+from backend.rollup import fetch_daily_sentiment
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -13,16 +15,34 @@ st.set_page_config(
 )
 
 # --- Helper Functions ---
-def get_tickers():
+# Loaders are cached per data version (bumped whenever new sentiment or a new
+# ticker is committed), so widget interactions re-run the script without
+# touching the database until something actually changes.
+
+@st.cache_data(ttl=Config.API_CACHE_TTL, show_spinner=False)
+def get_data_version():
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT version FROM data_version WHERE id = 1")
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+@st.cache_data(show_spinner=False)
+def get_tickers(data_version):
     with get_db_connection() as conn:
-        return pd.read_sql_query("SELECT symbol FROM tickers", conn)
+        cursor = conn.cursor()
+        cursor.execute("SELECT symbol FROM tickers ORDER BY symbol")
+        return [row[0] for row in cursor.fetchall()]
 
 def add_ticker(symbol):
     with get_db_connection() as conn:
         try:
             cursor = conn.cursor()
             cursor.execute("INSERT INTO tickers (symbol) VALUES (%s)", (symbol.upper(),))
+            bump_data_version(cursor)
             conn.commit()
+            # Show the new ticker now rather than after the version probe expires
+            get_data_version.clear()
             st.success(f"Added ticker: {symbol.upper()}")
         except conn.IntegrityError:
             st.warning(f"Ticker {symbol.upper()} is already tracked.")
@@ -30,7 +50,9 @@ def add_ticker(symbol):
             cursor.close()
 
 
-def get_sentiment_data(ticker_symbol):
+@st.cache_data(show_spinner=False)
+def get_recent_news(ticker_symbol, data_version, limit=10):
+    """The newest scored articles for the news panel; served by the (ticker, published_at) index."""
     query = """
         SELECT
             a.published_at,
@@ -43,10 +65,22 @@ def get_sentiment_data(ticker_symbol):
         JOIN tickers t ON a.ticker_id = t.id
         WHERE t.symbol = %s
         ORDER BY a.published_at DESC
+        LIMIT %s
     """
     with get_db_connection() as conn:
-        # The params argument for read_sql_query with psycopg2 needs a list or tuple
-        return pd.read_sql_query(query, conn, params=(ticker_symbol,))
+        cursor = conn.cursor()
+        cursor.execute(query, (ticker_symbol, limit))
+        columns = [col[0] for col in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+@st.cache_data(show_spinner=False)
+def get_daily_sentiment(ticker_symbol, data_version):
+    """Daily sentiment counts for the chart, aggregated in SQL by the daily rollup."""
+    daily = pd.DataFrame(fetch_daily_sentiment(ticker_symbol))
+    if daily.empty:
+        return daily
+    daily['day'] = pd.to_datetime(daily['day'])
+    return daily.set_index('day')[['positive', 'negative', 'neutral']]
 
 # --- UI Components ---
 st.title("📊 SentimentLens: Financial News Sentiment Engine")
@@ -60,34 +94,33 @@ with st.sidebar.form("add_ticker_form"):
         add_ticker(new_ticker)
 
 st.sidebar.header("Tracked Tickers")
-tracked_tickers = get_tickers()
+data_version = get_data_version()
 selected_ticker = st.sidebar.selectbox(
     "Select a ticker to view sentiment",
-    tracked_tickers['symbol'].tolist()
+    get_tickers(data_version)
 )
 
 # --- Main Dashboard ---
 if selected_ticker:
     st.header(f"Sentiment Analysis for ${selected_ticker}")
-    sentiment_df = get_sentiment_data(selected_ticker)
+    recent_news = get_recent_news(selected_ticker, data_version)
 
-    if not sentiment_df.empty:
+    if recent_news:
         # --- Sentiment Over Time Chart ---
         st.subheader("Sentiment Trend")
-        sentiment_df['published_at'] = pd.to_datetime(sentiment_df['published_at'])
-        sentiment_counts = sentiment_df.set_index('published_at').resample('D')['sentiment'].value_counts().unstack(fill_value=0)
+        sentiment_counts = get_daily_sentiment(selected_ticker, data_version)
         fig = px.bar(sentiment_counts, x=sentiment_counts.index, y=sentiment_counts.columns,
                      title=f"Daily Sentiment Count for ${selected_ticker}",
-                     labels={'value': 'Number of Articles', 'published_at': 'Date'},
+                     labels={'value': 'Number of Articles', 'day': 'Date'},
                      color_discrete_map={'positive': 'green', 'negative': 'red', 'neutral': 'grey'})
         st.plotly_chart(fig, use_container_width=True)
 
         # --- Latest News Articles ---
         st.subheader("Recent News and Sentiment")
-        for _, row in sentiment_df.head(10).iterrows():
-            st.markdown(f"**[{row['title']}]({row['url']})**")
-            color = "green" if row['sentiment'] == 'positive' else "red" if row['sentiment'] == 'negative' else "grey"
-            st.markdown(f"> Sentiment: <span style='color:{color};'>{row['sentiment']}</span> (Confidence: {row['confidence']:.2f})", unsafe_allow_html=True)
+        for article in recent_news:
+            st.markdown(f"**[{article['title']}]({article['url']})**")
+            color = "green" if article['sentiment'] == 'positive' else "red" if article['sentiment'] == 'negative' else "grey"
+            st.markdown(f"> Sentiment: <span style='color:{color};'>{article['sentiment']}</span> (Confidence: {article['confidence']:.2f})", unsafe_allow_html=True)
             st.markdown("---")
     else:
         st.info(f"No sentiment data available for ${selected_ticker}. The backend might still be processing.")
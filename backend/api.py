@@ -1,17 +1,66 @@
-from flask import Flask, jsonify
-import pandas as pd
+from flask import Flask, Response, jsonify, make_response, request, stream_with_context, url_for
+import base64
+import json
+from datetime import date, datetime
+from backend.config import Config
 from backend.database import get_db_connection
+from backend.streaming import NDJSON_MIMETYPE, dumps, encode_page, stream_rows
+from backend.response_cache import response_cache
+from backend.rollup import fetch_daily_sentiment
 import threading
-import time
-import schedule
-from scripts.scheduled_tasks import run_all_tasks
+from werkzeug.middleware.proxy_fix import ProxyFix
+from scripts.scheduled_tasks import run_scheduler as run_leader_scheduler
+from backend.leader import LeaderElector
 
 app = Flask(__name__)
+if Config.API_TRUSTED_PROXIES:
+    # Behind a TLS-terminating proxy, pagination links would otherwise say http://
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.API_TRUSTED_PROXIES,
+                            x_proto=Config.API_TRUSTED_PROXIES, x_host=Config.API_TRUSTED_PROXIES,
+                            x_port=Config.API_TRUSTED_PROXIES)
 
-def get_sentiment_data_for_api(ticker_symbol):
-    """Helper function to fetch sentiment data for the API."""
-    query = """
+# Every gunicorn worker competes for leadership; only the winner runs the ETL
+scheduler_elector = LeaderElector()
+
+# Page size bounds for /api/sentiment/<ticker>
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(published_at, row_id):
+    """Builds the opaque keyset cursor for the row a page ended on."""
+    payload = json.dumps([published_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    published_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    return datetime.fromisoformat(published_at), int(row_id)
+
+
+def get_sentiment_data_for_api(ticker_symbol, limit=DEFAULT_PAGE_SIZE, since=None, until=None, cursor=None):
+    """
+    Helper function to fetch one page of sentiment data for the API, newest
+    first, using keyset pagination on (published_at, id). Rows without a
+    published_at have no place in that order and are not returned. Returns a
+    generator of up to limit + 1 row dicts streamed from a server-side cursor.
+    """
+    conditions = ["t.symbol = %(symbol)s", "a.published_at IS NOT NULL"]
+    params = {"symbol": ticker_symbol, "limit": limit + 1}
+    if since is not None:
+        conditions.append("a.published_at >= %(since)s")
+        params["since"] = since
+    if until is not None:
+        conditions.append("a.published_at < %(until)s")
+        params["until"] = until
+    if cursor is not None:
+        conditions.append("(a.published_at, s.id) < (%(cursor_published_at)s, %(cursor_id)s)")
+        params["cursor_published_at"], params["cursor_id"] = cursor
+
+    query = f"""
         SELECT
+            s.id,
             a.published_at,
             s.sentiment,
             s.confidence,
@@ -21,39 +70,119 @@ def get_sentiment_data_for_api(ticker_symbol):
         FROM sentiment_data s
         JOIN articles a ON s.article_id = a.id
         JOIN tickers t ON a.ticker_id = t.id
-        WHERE t.symbol = %s
-        ORDER BY a.published_at DESC
+        WHERE {' AND '.join(conditions)}
+        ORDER BY a.published_at DESC, s.id DESC
+        LIMIT %(limit)s
     """
-    with get_db_connection() as conn:
-        df = pd.read_sql_query(query, conn, params=(ticker_symbol,))
-        return df.to_dict(orient='records')
+    # One extra row is fetched to know whether another page exists
+    return stream_rows(query, params)
+
+
+def parse_page_args(args):
+    """Validates the pagination query parameters. Raises ValueError on bad input."""
+    limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    since = datetime.fromisoformat(args['since']) if args.get('since') else None
+    until = datetime.fromisoformat(args['until']) if args.get('until') else None
+    try:
+        cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    except (ValueError, TypeError):
+        raise ValueError("cursor is invalid")
+    return limit, since, until, cursor
+
+def wants_ndjson():
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
 
 @app.route('/api/tickers', methods=['GET'])
 def get_tickers_api():
     """API endpoint to get the list of all tracked tickers."""
-    with get_db_connection() as conn:
-        tickers_df = pd.read_sql_query("SELECT symbol FROM tickers", conn)
-    return jsonify(tickers_df['symbol'].tolist())
+    def build():
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT symbol FROM tickers")
+            symbols = [row[0] for row in cursor.fetchall()]
+        return Response(dumps(symbols), mimetype='application/json')
+
+    return response_cache.serve(request.url, build)
 
 @app.route('/api/sentiment/<string:ticker_symbol>', methods=['GET'])
 def get_sentiment_api(ticker_symbol):
-    """API endpoint to get sentiment data for a specific ticker."""
-    data = get_sentiment_data_for_api(ticker_symbol.upper())
-    if data:
-        return jsonify(data)
-    else:
-        return jsonify({"error": f"No data found for ticker {ticker_symbol}"}), 404
+    """
+    API endpoint to get sentiment data for a specific ticker, newest first.
+    Query parameters: limit, since/until (ISO dates) and cursor (from `next`).
+    Send `Accept: application/x-ndjson` to receive one row per line.
+    """
+    try:
+        limit, since, until, cursor = parse_page_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    ndjson = wants_ndjson()
+
+    def build():
+        symbol = ticker_symbol.upper()
+        rows = get_sentiment_data_for_api(symbol, limit, since, until, cursor)
+        first = next(rows, None)
+        if first is None and cursor is None and since is None and until is None:
+            return make_response(jsonify({"error": f"No data found for ticker {ticker_symbol}"}), 404)
+
+        next_args = {k: v for k, v in request.args.items() if k != 'cursor'}
+
+        def next_url_for(last_row):
+            return url_for('get_sentiment_api', ticker_symbol=symbol,
+                           cursor=encode_cursor(last_row['published_at'], last_row['id']),
+                           _external=True, **next_args)
+
+        def page_rows():
+            # Closing this generator early also returns the streaming connection
+            try:
+                if first is not None:
+                    yield first
+                    yield from rows
+            finally:
+                rows.close()
+
+        body = encode_page(page_rows(), limit, {"ticker": symbol}, next_url_for, ndjson=ndjson)
+        return Response(stream_with_context(body),
+                        mimetype=NDJSON_MIMETYPE if ndjson else 'application/json')
+
+    response = response_cache.serve((request.url, ndjson), build)
+    response.vary.add('Accept')
+    return response
+
+@app.route('/api/sentiment/<string:ticker_symbol>/daily', methods=['GET'])
+def get_daily_sentiment_api(ticker_symbol):
+    """
+    API endpoint to get a ticker's daily sentiment rollup, oldest day first.
+    Query parameters: since/until (ISO dates, inclusive).
+    """
+    try:
+        since = date.fromisoformat(request.args['since']) if request.args.get('since') else None
+        until = date.fromisoformat(request.args['until']) if request.args.get('until') else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def build():
+        symbol = ticker_symbol.upper()
+        data = fetch_daily_sentiment(symbol, since, until)
+        if not data and since is None and until is None:
+            return make_response(jsonify({"error": f"No data found for ticker {ticker_symbol}"}), 404)
+        return Response(dumps({"ticker": symbol, "data": data}), mimetype='application/json')
+
+    return response_cache.serve(request.url, build)
+
+@app.route('/api/scheduler/leader', methods=['GET'])
+def get_scheduler_leader_api():
+    """API endpoint reporting which process currently runs the scheduler."""
+    leader = scheduler_elector.current_leader()
+    leader["is_self"] = leader.get("leader") == scheduler_elector.identity
+    return jsonify(leader)
 
 def run_scheduler():
-    """Runs the scheduled tasks in a loop."""
-    # Run the tasks once immediately on startup
-    run_all_tasks() 
-    
-    # Then schedule them to run every hour
-    schedule.every().hour.do(run_all_tasks)
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    """Runs the scheduled tasks in a loop, if this worker wins the leader election."""
+    run_leader_scheduler(scheduler_elector)
 
 # This block will not run when using Gunicorn, but it's good for local testing.
 # The entrypoint.sh script will start Gunicorn directly.
@@ -66,7 +195,9 @@ if __name__ == '__main__':
     # Run the Flask app
     app.run(debug=True, port=5000)
 
-# Start the scheduler when the app is run with Gunicorn
-scheduler_thread = threading.Thread(target=run_scheduler)
-scheduler_thread.daemon = True
-scheduler_thread.start()
+# Start the scheduler when the app is run with Gunicorn. The model is loaded
+# inside this thread, only once this worker has been elected leader.
+if Config.RUN_SCHEDULER_IN_API:
+    scheduler_thread = threading.Thread(target=run_scheduler)
+    scheduler_thread.daemon = True
+    scheduler_thread.start()
@@ -1,6 +1,7 @@
 
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,9 +9,78 @@ load_dotenv()
 class Config:
     """Holds all configuration for the application."""
     NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+    # Point this at a local fake server to test fetching without the real API
+    NEWS_API_BASE_URL = os.getenv("NEWS_API_BASE_URL", "https://newsapi.org/v2/everything")
+    NEWS_FETCH_CONCURRENCY = int(os.getenv("NEWS_FETCH_CONCURRENCY", "8"))
+    # Token-bucket limits; set these to match the NewsAPI plan's quota
+    NEWS_API_RATE_PER_SECOND = float(os.getenv("NEWS_API_RATE_PER_SECOND", "5"))
+    NEWS_API_BURST = int(os.getenv("NEWS_API_BURST", "10"))
+    NEWS_API_MAX_RETRIES = int(os.getenv("NEWS_API_MAX_RETRIES", "4"))
+    NEWS_API_TIMEOUT = float(os.getenv("NEWS_API_TIMEOUT", "15"))
+    # Pagination: 100 is the NewsAPI maximum page size
+    NEWS_API_PAGE_SIZE = int(os.getenv("NEWS_API_PAGE_SIZE", "100"))
+    NEWS_API_MAX_PAGES = int(os.getenv("NEWS_API_MAX_PAGES", "5"))
+    # How far back to look for a ticker that has no watermark yet
+    NEWS_INITIAL_LOOKBACK_HOURS = int(os.getenv("NEWS_INITIAL_LOOKBACK_HOURS", "24"))
+    # NewsAPI indexes some articles late; incremental fetches re-read this far before the watermark
+    NEWS_WATERMARK_OVERLAP_MINUTES = int(os.getenv("NEWS_WATERMARK_OVERLAP_MINUTES", "60"))
     DATABASE_URL = "sentiment_lens.db"
+    # Inference work queue
+    QUEUE_CLAIM_SIZE = int(os.getenv("QUEUE_CLAIM_SIZE", "128"))
+    QUEUE_LEASE_SECONDS = int(os.getenv("QUEUE_LEASE_SECONDS", "600"))
+    QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+    # Number of inference processes the scheduler runs (1 = score in-process)
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+    # Longest a cycle waits for the workers to drain the queue before alerting
+    INFERENCE_DRAIN_TIMEOUT = int(os.getenv("INFERENCE_DRAIN_TIMEOUT", "1800"))
+    # "batch" runs fetch, inference and alerting one after another each cycle;
+    # "pipeline" streams articles through bounded queues between the stages
+    ETL_MODE = os.getenv("ETL_MODE", "batch")
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "512"))
+    PIPELINE_INFERENCE_THREADS = int(os.getenv("PIPELINE_INFERENCE_THREADS", "1"))
+    PIPELINE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "32"))
+    PIPELINE_BATCH_WAIT_SECONDS = float(os.getenv("PIPELINE_BATCH_WAIT_SECONDS", "2"))
+    PIPELINE_ALERT_INTERVAL_SECONDS = float(os.getenv("PIPELINE_ALERT_INTERVAL_SECONDS", "5"))
+    # Local Parquet price store; PRICE_PROVIDER is "yfinance" or "fixture"
+    # (CSV files in PRICE_FIXTURE_DIR, for offline runs)
+    PRICE_STORE_DIR = os.getenv("PRICE_STORE_DIR", "price_store")
+    PRICE_PROVIDER = os.getenv("PRICE_PROVIDER", "yfinance")
+    PRICE_FIXTURE_DIR = os.getenv("PRICE_FIXTURE_DIR", "price_fixtures")
+    # How long today's (possibly unfinished) bar is trusted before it is fetched again
+    PRICE_REFRESH_SECONDS = float(os.getenv("PRICE_REFRESH_SECONDS", "900"))
+    # A range with past weekdays that comes back empty is retried once after this
+    # long; a second empty answer (e.g. a market holiday) is accepted as covered
+    PRICE_EMPTY_RETRY_SECONDS = float(os.getenv("PRICE_EMPTY_RETRY_SECONDS", "300"))
+    # Read API response cache: how long a data-version probe is trusted, and bounds
+    API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "30"))
+    API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+    API_CACHE_MAX_BODY_BYTES = int(os.getenv("API_CACHE_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+    # Reverse proxies in front of the API (Render's load balancer is one) whose
+    # X-Forwarded-* headers are trusted when building absolute URLs; 0 trusts none
+    API_TRUSTED_PROXIES = int(os.getenv("API_TRUSTED_PROXIES", "1"))
+    # Alert rules, evaluated over a sliding window of recent articles per ticker
+    ALERT_WINDOW_HOURS = int(os.getenv("ALERT_WINDOW_HOURS", "24"))
+    ALERT_COOLDOWN_HOURS = float(os.getenv("ALERT_COOLDOWN_HOURS", "6"))
+    ALERT_NEGATIVE_COUNT = int(os.getenv("ALERT_NEGATIVE_COUNT", "3"))
+    ALERT_NEGATIVE_RATIO = float(os.getenv("ALERT_NEGATIVE_RATIO", "0.6"))
+    ALERT_WEIGHTED_SCORE = float(os.getenv("ALERT_WEIGHTED_SCORE", "-0.4"))
+    ALERT_MIN_ARTICLES = int(os.getenv("ALERT_MIN_ARTICLES", "5"))
+    # Scheduler leader election across API workers and hosts. Set
+    # RUN_SCHEDULER_IN_API=false to keep the API read-only (and free of the ML
+    # stack) when the ETL runs as its own service.
+    RUN_SCHEDULER_IN_API = os.getenv("RUN_SCHEDULER_IN_API", "true").lower() in ("1", "true", "yes")
+    SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE", os.path.join(tempfile.gettempdir(), "sentimentlens-scheduler.lock"))
+    SCHEDULER_HEARTBEAT_SECONDS = float(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", "15"))
+    SCHEDULER_ELECTION_POLL_SECONDS = float(os.getenv("SCHEDULER_ELECTION_POLL_SECONDS", "30"))
     SMTP_SERVER = os.getenv("SMTP_SERVER")
     SMTP_PORT = os.getenv("SMTP_PORT")
     SMTP_USER = os.getenv("SMTP_USER")
     SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+    SMTP_FROM = os.getenv("SMTP_FROM") or SMTP_USER
+    SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes")
     ALERT_RECIPIENT_EMAIL = os.getenv("ALERT_RECIPIENT_EMAIL")
+    # Alert outbox delivery
+    ALERT_DELIVERY_POLL_SECONDS = float(os.getenv("ALERT_DELIVERY_POLL_SECONDS", "10"))
+    ALERT_MAX_ATTEMPTS = int(os.getenv("ALERT_MAX_ATTEMPTS", "6"))
+    ALERT_RETRY_BASE_SECONDS = float(os.getenv("ALERT_RETRY_BASE_SECONDS", "30"))
+    ALERT_RETRY_MAX_SECONDS = float(os.getenv("ALERT_RETRY_MAX_SECONDS", "3600"))
@@ -1,18 +1,118 @@
 import os
+import threading
+import time
 import psycopg2
+from psycopg2 import extensions, pool
 from contextlib import contextmanager
 
 # The DATABASE_URL will be provided by Render's environment
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Connection pool sizing; each gunicorn worker / process gets its own pool
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', '10'))
+# Seconds to wait for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+# Connections idle for longer than this are pinged before being handed out
+DB_POOL_PING_AFTER = float(os.environ.get('DB_POOL_PING_AFTER', '30'))
+
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+_last_used = {}
+# Pools inherited from a parent process. They are kept referenced (and never
+# closed) because their sockets still belong to the parent's sessions.
+_inherited_pools = []
+
+
+def _get_pool():
+    """Returns this process's connection pool, creating a fresh one after a fork."""
+    global _pool, _pool_pid, _pool_slots
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                if _pool is not None:
+                    _inherited_pools.append(_pool)
+                    _last_used.clear()
+                _pool = pool.ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, DATABASE_URL)
+                _pool_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+                _pool_pid = pid
+    return _pool, _pool_slots
+
+
+def _is_healthy(conn):
+    if conn.closed:
+        return False
+    if time.monotonic() - _last_used.get(id(conn), 0) < DB_POOL_PING_AFTER:
+        return True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _checkout(db_pool):
+    """Takes a healthy connection from the pool, replacing dead ones."""
+    for _ in range(DB_POOL_MAX + 1):
+        conn = db_pool.getconn()
+        if _is_healthy(conn):
+            return conn
+        _last_used.pop(id(conn), None)
+        db_pool.putconn(conn, close=True)
+    raise psycopg2.OperationalError("Could not obtain a healthy database connection from the pool.")
+
+
+def _checkin(db_pool, conn):
+    """Returns a connection to the pool with no transaction left open."""
+    discard = conn.closed
+    if not discard and conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            discard = True
+    if discard:
+        _last_used.pop(id(conn), None)
+    else:
+        _last_used[id(conn)] = time.monotonic()
+    db_pool.putconn(conn, close=discard)
+
+
 @contextmanager
 def get_db_connection():
-    """Context manager for PostgreSQL database connections."""
-    conn = psycopg2.connect(DATABASE_URL)
+    """Context manager for pooled PostgreSQL database connections."""
+    db_pool, slots = _get_pool()
+    if not slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise pool.PoolError(f"No database connection became available within {DB_POOL_TIMEOUT}s.")
     try:
-        yield conn
+        conn = _checkout(db_pool)
+        try:
+            yield conn
+        finally:
+            _checkin(db_pool, conn)
     finally:
-        conn.close()
+        slots.release()
+
+
+def close_pool():
+    """Closes every pooled connection owned by this process."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _last_used.clear()
+
+def bump_data_version(cursor):
+    """Marks API-visible data as changed. Call inside the transaction that changes it."""
+    cursor.execute(
+        "UPDATE data_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE id = 1"
+    )
+
 
 def initialize_db():
     """Initializes the database with the required tables."""
@@ -50,14 +150,43 @@ def initialize_db():
         );
     """
 
+    # Sentiment predictions keyed by normalized-text hash and model, shared
+    # across syndicated copies of a story and across restarts
+    prediction_cache_table = """
+        CREATE TABLE IF NOT EXISTS prediction_cache (
+            text_hash TEXT NOT NULL,
+            model_id TEXT NOT NULL,
+            sentiment TEXT NOT NULL,
+            confidence REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (text_hash, model_id)
+        );
+    """
+
+    # Newest publishedAt fetched per ticker, so each cycle only asks for newer news
+    ticker_watermarks_table = """
+        CREATE TABLE IF NOT EXISTS ticker_watermarks (
+            ticker_id INTEGER PRIMARY KEY,
+            last_published_at TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (ticker_id) REFERENCES tickers (id)
+        );
+    """
+
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(tickers_table)
         cursor.execute(articles_table)
         cursor.execute(sentiment_data_table)
+        cursor.execute(prediction_cache_table)
+        cursor.execute(ticker_watermarks_table)
         conn.commit()
         print("Database initialized successfully.")
 
+    # Indexes and later schema changes are applied as versioned migrations
+    from backend.migrations import run_migrations
+    run_migrations()
+
 if __name__ == '__main__':
     if not DATABASE_URL:
         raise ValueError("DATABASE_URL environment variable is not set.")
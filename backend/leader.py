@@ -0,0 +1,228 @@
+# SentimentLens/backend/leader.py
+
+import fcntl
+import json
+import os
+import socket
+import time
+from datetime import datetime
+
+import psycopg2
+
+from backend.config import Config
+from backend.database import DATABASE_URL, get_db_connection
+
+# Application-wide key for the scheduler's session-level advisory lock
+SCHEDULER_LOCK_ID = 741852964
+
+
+class LeaderElector:
+    """
+    Elects a single scheduler leader across processes and hosts. The leader
+    holds a Postgres session-level advisory lock on a dedicated connection, so
+    the lock is released as soon as the leader's process (or host, via TCP
+    keepalives) dies and a follower can take over. Only when DATABASE_URL is
+    unset does an exclusive file lock elect one leader per host instead.
+    """
+
+    def __init__(self, lock_file=None, heartbeat_seconds=None):
+        self.lock_file = lock_file or Config.SCHEDULER_LOCK_FILE
+        self.heartbeat_seconds = heartbeat_seconds or Config.SCHEDULER_HEARTBEAT_SECONDS
+        self.backend = None
+        self._conn = None
+        self._file = None
+        self._last_heartbeat = 0.0
+
+    @property
+    def identity(self):
+        # Resolved on use so an elector created before a fork names the child
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def try_acquire(self):
+        """Attempts to become leader without blocking. Returns True on success."""
+        if self.backend is not None:
+            return self.is_leader()
+        if not DATABASE_URL:
+            return self._try_acquire_file()
+        # With a database, only the advisory lock elects: a file lock taken on a
+        # transient error would not exclude the Postgres leader
+        try:
+            return self._try_acquire_postgres()
+        except psycopg2.Error as e:
+            print(f"Leader election via Postgres failed; retrying at the next poll: {e}")
+            return False
+
+    def wait_for_leadership(self, poll_seconds=None):
+        """Blocks until this process is the leader."""
+        poll_seconds = poll_seconds or Config.SCHEDULER_ELECTION_POLL_SECONDS
+        announced = False
+        while not self.try_acquire():
+            if not announced:
+                print(f"Scheduler follower {self.identity}: waiting for the current leader to step down.")
+                announced = True
+            time.sleep(poll_seconds)
+        print(f"Scheduler leader elected: {self.identity} (via {self.backend} lock).")
+
+    def is_leader(self):
+        """Confirms leadership, refreshing the heartbeat at most every heartbeat_seconds."""
+        if self.backend is None:
+            return False
+        if time.monotonic() - self._last_heartbeat < self.heartbeat_seconds:
+            return True
+        try:
+            self._heartbeat()
+        except (psycopg2.Error, OSError) as e:
+            print(f"Lost scheduler leadership: {e}")
+            self.release()
+            return False
+        return True
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()  # Closing the session releases the advisory lock
+            except psycopg2.Error:
+                pass
+            self._conn = None
+        if self._file is not None:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        self.backend = None
+
+    def current_leader(self):
+        """Describes the current leader, as far as this process can see it."""
+        if not DATABASE_URL:
+            return self._current_leader_file()
+        try:
+            return self._current_leader_postgres()
+        except psycopg2.Error as e:
+            return {"leader": None, "backend": "postgres", "error": str(e)}
+
+    # --- Postgres advisory lock ---
+
+    def _try_acquire_postgres(self):
+        conn = psycopg2.connect(
+            DATABASE_URL,
+            application_name=f"sentimentlens-scheduler {self.identity}",
+            keepalives=1, keepalives_idle=30, keepalives_interval=10, keepalives_count=3,
+        )
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (SCHEDULER_LOCK_ID,))
+            acquired = cursor.fetchone()[0]
+        if not acquired:
+            conn.close()
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    INSERT INTO scheduler_leader (id, holder, acquired_at, heartbeat_at)
+                    VALUES (1, %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ON CONFLICT (id) DO UPDATE SET
+                        holder = EXCLUDED.holder,
+                        acquired_at = EXCLUDED.acquired_at,
+                        heartbeat_at = EXCLUDED.heartbeat_at
+                    """,
+                    (self.identity,)
+                )
+        except psycopg2.Error:
+            # Don't keep holding the lock on a session we are abandoning
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (SCHEDULER_LOCK_ID,))
+            except psycopg2.Error:
+                pass
+            conn.close()
+            raise
+        self._conn = conn
+        self.backend = "postgres"
+        self._last_heartbeat = time.monotonic()
+        return True
+
+    def _current_leader_postgres(self):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT l.holder, l.acquired_at, l.heartbeat_at,
+                       EXISTS (SELECT 1 FROM pg_locks
+                               WHERE locktype = 'advisory' AND granted
+                                 AND ((classid::bigint << 32) | objid::bigint) = %s)
+                FROM scheduler_leader l
+                WHERE l.id = 1
+                """,
+                (SCHEDULER_LOCK_ID,)
+            )
+            row = cursor.fetchone()
+        if row is None or not row[3]:
+            return {"leader": None, "backend": "postgres"}
+        return {
+            "leader": row[0],
+            "backend": "postgres",
+            "acquired_at": row[1].isoformat() if row[1] else None,
+            "heartbeat_at": row[2].isoformat() if row[2] else None,
+        }
+
+    # --- Local file lock fallback ---
+
+    def _try_acquire_file(self):
+        lock = open(self.lock_file, "a+")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock.close()
+            return False
+        self._file = lock
+        self.backend = "file"
+        self._write_file_record(acquired_at=datetime.utcnow().isoformat())
+        self._last_heartbeat = time.monotonic()
+        return True
+
+    def _write_file_record(self, acquired_at=None):
+        record = {"leader": self.identity, "heartbeat_at": datetime.utcnow().isoformat()}
+        self._file.seek(0)
+        try:
+            previous = json.loads(self._file.read() or "{}")
+        except ValueError:
+            previous = {}
+        record["acquired_at"] = acquired_at or previous.get("acquired_at")
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(json.dumps(record))
+        self._file.flush()
+
+    def _current_leader_file(self):
+        if not os.path.exists(self.lock_file):
+            return {"leader": None, "backend": "file"}
+        with open(self.lock_file, "a+") as lock:
+            held = self._file is not None
+            if not held:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                except BlockingIOError:
+                    held = True
+            if not held:
+                return {"leader": None, "backend": "file"}
+            lock.seek(0)
+            try:
+                record = json.loads(lock.read() or "{}")
+            except ValueError:
+                record = {}
+        return dict(record, backend="file")
+
+    def _heartbeat(self):
+        if self.backend == "postgres":
+            with self._conn.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE scheduler_leader SET heartbeat_at = CURRENT_TIMESTAMP WHERE id = 1 AND holder = %s",
+                    (self.identity,)
+                )
+        else:
+            self._write_file_record()
+        self._last_heartbeat = time.monotonic()
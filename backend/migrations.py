@@ -0,0 +1,226 @@
+# SentimentLens/backend/migrations.py
+
+from backend.database import get_db_connection
+
+# Arbitrary application-wide key for pg_advisory_xact_lock, so concurrent
+# processes (e.g. several gunicorn workers) never run migrations twice.
+MIGRATION_LOCK_ID = 741852963
+
+# Ordered (version, name, statements). Never edit an applied migration;
+# append a new one instead.
+MIGRATIONS = [
+    (1, "query_index_pack", [
+        # Dashboard/API lookups: a ticker's articles, newest first
+        "CREATE INDEX IF NOT EXISTS idx_articles_ticker_published ON articles (ticker_id, published_at DESC)",
+        # Time-window filters that are not scoped to a ticker (alerts)
+        "CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at)",
+        # Sentiment rows are attributed to the model that produced them
+        "ALTER TABLE sentiment_data ADD COLUMN IF NOT EXISTS model_id TEXT NOT NULL DEFAULT 'default'",
+        # Keep the earliest row where an article was scored twice by the same model
+        """
+        DELETE FROM sentiment_data s
+        USING sentiment_data d
+        WHERE s.article_id = d.article_id AND s.model_id = d.model_id AND s.id > d.id
+        """,
+        # One sentiment row per article per model; also serves the article joins
+        # and the unscored-article anti-join in process_new_articles
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_sentiment_article_model ON sentiment_data (article_id, model_id)",
+        # Alert aggregation filters on sentiment before joining to articles
+        "CREATE INDEX IF NOT EXISTS idx_sentiment_sentiment_article ON sentiment_data (sentiment, article_id)",
+    ]),
+    (2, "article_queue", [
+        # Explicit processing state so workers claim work instead of anti-joining
+        """
+        CREATE TABLE IF NOT EXISTS article_queue (
+            article_id INTEGER PRIMARY KEY REFERENCES articles (id),
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker_id TEXT,
+            lease_expires_at TIMESTAMP,
+            last_error TEXT,
+            enqueued_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # Only unfinished rows are ever scanned when claiming
+        """
+        CREATE INDEX IF NOT EXISTS idx_article_queue_claimable
+        ON article_queue (enqueued_at)
+        WHERE status IN ('pending', 'processing')
+        """,
+        # Queue the existing backlog of unscored articles
+        """
+        INSERT INTO article_queue (article_id)
+        SELECT a.id FROM articles a
+        WHERE NOT EXISTS (SELECT 1 FROM sentiment_data s WHERE s.article_id = a.id)
+        ON CONFLICT (article_id) DO NOTHING
+        """,
+    ]),
+    (3, "data_version", [
+        # Single-row counter bumped in the same transaction as any change the
+        # read API can see; API caches and ETags are keyed on it
+        """
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING",
+    ]),
+    (4, "sentiment_daily", [
+        # Per-ticker daily rollup, maintained as sentiment rows are inserted
+        # (see backend/rollup.py); charts read O(days) rows from it
+        """
+        CREATE TABLE IF NOT EXISTS sentiment_daily (
+            ticker_id INTEGER NOT NULL REFERENCES tickers (id),
+            day DATE NOT NULL,
+            positive INTEGER NOT NULL DEFAULT 0,
+            negative INTEGER NOT NULL DEFAULT 0,
+            neutral INTEGER NOT NULL DEFAULT 0,
+            mean_score REAL NOT NULL DEFAULT 0,
+            mean_confidence REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (ticker_id, day)
+        )
+        """,
+        # Seed it from the existing history
+        """
+        INSERT INTO sentiment_daily (ticker_id, day, positive, negative, neutral, mean_score, mean_confidence)
+        SELECT
+            a.ticker_id,
+            a.published_at::date,
+            COUNT(*) FILTER (WHERE s.sentiment = 'positive'),
+            COUNT(*) FILTER (WHERE s.sentiment = 'negative'),
+            COUNT(*) FILTER (WHERE s.sentiment = 'neutral'),
+            AVG(CASE s.sentiment WHEN 'positive' THEN 1 WHEN 'negative' THEN -1 ELSE 0 END),
+            COALESCE(AVG(s.confidence), 0)
+        FROM sentiment_data s
+        JOIN articles a ON a.id = s.article_id
+        WHERE a.published_at IS NOT NULL
+          AND s.sentiment IN ('positive', 'negative', 'neutral')
+        GROUP BY a.ticker_id, a.published_at::date
+        ON CONFLICT (ticker_id, day) DO NOTHING
+        """,
+    ]),
+    (5, "alert_engine", [
+        # Hourly per-ticker counters that make up the sliding alert window
+        """
+        CREATE TABLE IF NOT EXISTS alert_window_buckets (
+            ticker_id INTEGER NOT NULL REFERENCES tickers (id),
+            bucket_start TIMESTAMP NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            negative INTEGER NOT NULL DEFAULT 0,
+            weighted_score REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (ticker_id, bucket_start)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_alert_window_buckets_start ON alert_window_buckets (bucket_start)",
+        # Tickers with new events since the last evaluation
+        """
+        CREATE TABLE IF NOT EXISTS alert_dirty_tickers (
+            ticker_id INTEGER PRIMARY KEY REFERENCES tickers (id)
+        )
+        """,
+        # Per-ticker, per-rule firing state, so each breach alerts once
+        """
+        CREATE TABLE IF NOT EXISTS alert_state (
+            ticker_id INTEGER NOT NULL REFERENCES tickers (id),
+            rule TEXT NOT NULL,
+            active BOOLEAN NOT NULL DEFAULT FALSE,
+            last_value REAL,
+            last_fired_at TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (ticker_id, rule)
+        )
+        """,
+        # Seed the window from the last two days of history
+        """
+        INSERT INTO alert_window_buckets (ticker_id, bucket_start, total, negative, weighted_score)
+        SELECT
+            a.ticker_id,
+            date_trunc('hour', a.published_at),
+            COUNT(*),
+            COUNT(*) FILTER (WHERE s.sentiment = 'negative'),
+            SUM(CASE s.sentiment WHEN 'positive' THEN 1 WHEN 'negative' THEN -1 ELSE 0 END
+                * COALESCE(s.confidence, 0))
+        FROM sentiment_data s
+        JOIN articles a ON a.id = s.article_id
+        WHERE a.published_at >= (CURRENT_TIMESTAMP AT TIME ZONE 'UTC') - INTERVAL '48 hours'
+        GROUP BY a.ticker_id, date_trunc('hour', a.published_at)
+        ON CONFLICT (ticker_id, bucket_start) DO NOTHING
+        """,
+        "INSERT INTO alert_dirty_tickers (ticker_id) SELECT DISTINCT ticker_id FROM alert_window_buckets ON CONFLICT DO NOTHING",
+    ]),
+    (6, "alert_outbox", [
+        # Alerts waiting for (or done with) email delivery by the background worker
+        """
+        CREATE TABLE IF NOT EXISTS alert_outbox (
+            id SERIAL PRIMARY KEY,
+            subject TEXT NOT NULL,
+            body TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_alert_outbox_pending
+        ON alert_outbox (next_attempt_at)
+        WHERE status = 'pending'
+        """,
+    ]),
+    (7, "scheduler_leader", [
+        # Who currently holds the scheduler advisory lock, for visibility only;
+        # the lock itself is what guarantees a single leader
+        """
+        CREATE TABLE IF NOT EXISTS scheduler_leader (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            holder TEXT NOT NULL,
+            acquired_at TIMESTAMP,
+            heartbeat_at TIMESTAMP
+        )
+        """,
+    ]),
+]
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def run_migrations():
+    """Applies every pending migration in order, in a single transaction."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            """
+        )
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        applied = applied_versions(cursor)
+
+        for version, name, statements in MIGRATIONS:
+            if version in applied:
+                continue
+            print(f"Applying migration {version:03d}_{name}...")
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+        conn.commit()
+        print("Database schema is up to date.")
+
+
+if __name__ == '__main__':
+    run_migrations()
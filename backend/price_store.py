@@ -0,0 +1,179 @@
+# SentimentLens/backend/price_store.py
+
+import json
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from backend.config import Config
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class YFinanceProvider:
+    """Daily OHLCV history from Yahoo Finance."""
+
+    def history(self, symbol, start, end):
+        # Imported here so fixture-backed runs never need the network client
+        import yfinance as yf
+        # yfinance treats `end` as exclusive
+        return yf.Ticker(symbol).history(start=start, end=end + timedelta(days=1))
+
+
+class CsvFixtureProvider:
+    """Reads `<SYMBOL>.csv` files (a Date column plus OHLCV) from a local directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def history(self, symbol, start, end):
+        path = os.path.join(self.directory, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=PRICE_COLUMNS)
+        df = pd.read_csv(path, index_col="Date", parse_dates=True)
+        return df.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+
+PROVIDERS = {
+    "yfinance": lambda: YFinanceProvider(),
+    "fixture": lambda: CsvFixtureProvider(Config.PRICE_FIXTURE_DIR),
+}
+
+
+def _normalize(df):
+    """Daily bars indexed by tz-naive midnight timestamps, OHLCV columns only."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=PRICE_COLUMNS, index=pd.DatetimeIndex([], name="Date"))
+    df = df[[c for c in PRICE_COLUMNS if c in df.columns]].copy()
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename("Date")
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+class PriceStore:
+    """
+    Local per-ticker Parquet cache of daily prices. Each ticker's file covers
+    a contiguous date range recorded in a sidecar JSON; a query only fetches
+    the days outside that range (older history, or the trailing days since
+    the last fetch) and is otherwise answered from disk.
+    """
+
+    def __init__(self, directory=None, provider=None, refresh_seconds=None, empty_retry_seconds=None):
+        self.directory = directory or Config.PRICE_STORE_DIR
+        self.provider = provider or PROVIDERS[Config.PRICE_PROVIDER]()
+        self.refresh_seconds = Config.PRICE_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self.empty_retry_seconds = (
+            Config.PRICE_EMPTY_RETRY_SECONDS if empty_retry_seconds is None else empty_retry_seconds
+        )
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_history(self, symbol, start, end=None):
+        """Returns daily OHLCV bars for `symbol` between `start` and `end` (dates, inclusive)."""
+        symbol = symbol.upper()
+        start = _as_date(start)
+        end = min(_as_date(end) if end else date.today(), date.today())
+        with self._lock_for(symbol):
+            df, coverage = self._load(symbol)
+            coverage = coverage or {}
+            missing = []
+            if "start" not in coverage:
+                missing.append(("all", start, end))
+            else:
+                covered_from = date.fromisoformat(coverage["start"])
+                covered_to = date.fromisoformat(coverage["end"])
+                if start < covered_from:
+                    missing.append(("head", start, covered_from - timedelta(days=1)))
+                # The last covered day is fetched again: it may have been an unfinished session
+                stale = time.time() - coverage.get("fetched_at", 0) >= self.refresh_seconds
+                if end > covered_to or (end == covered_to == date.today() and stale):
+                    missing.append(("tail", covered_to, end))
+
+            fetched = []
+            new_coverage = dict(coverage)
+            empty_ranges = dict(coverage.get("empty_ranges", {}))
+            now = time.time()
+            for kind, range_start, range_end in missing:
+                key = f"{range_start.isoformat()}:{range_end.isoformat()}"
+                first_empty_at = empty_ranges.get(key)
+                if first_empty_at is not None and now - first_empty_at < self.empty_retry_seconds:
+                    # Came back empty recently; don't ask the provider again yet
+                    continue
+                bars = _normalize(self.provider.history(symbol, range_start, range_end))
+                if bars.empty and _expects_bars(range_start, range_end) and first_empty_at is None:
+                    # Likely a rate limit or outage (older yfinance returns an empty
+                    # frame instead of raising); retry once after empty_retry_seconds,
+                    # and accept a second empty answer (e.g. a market holiday)
+                    print(f"Price store: no bars for {symbol} {range_start}..{range_end}; will retry.")
+                    empty_ranges[key] = now
+                    continue
+                empty_ranges.pop(key, None)
+                fetched.append(bars)
+                if kind in ("all", "head"):
+                    new_coverage["start"] = range_start.isoformat()
+                if kind in ("all", "tail"):
+                    new_coverage["end"] = range_end.isoformat()
+                    new_coverage["fetched_at"] = time.time()
+
+            # Bound the sidecar: ranges not asked for again within a day start over
+            empty_ranges = {k: t for k, t in empty_ranges.items() if now - t < 86400}
+            if fetched or empty_ranges != coverage.get("empty_ranges", {}):
+                new_coverage["empty_ranges"] = empty_ranges
+                if fetched:
+                    df = _normalize(pd.concat([df] + fetched))
+                    print(f"Price store: fetched {len(fetched)} missing range(s) for {symbol}.")
+                self._save(symbol, df, new_coverage)
+
+        return df.loc[pd.Timestamp(start):pd.Timestamp(end)]
+
+    def _lock_for(self, symbol):
+        with self._locks_guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _paths(self, symbol):
+        base = os.path.join(self.directory, symbol)
+        return f"{base}.parquet", f"{base}.json"
+
+    def _load(self, symbol):
+        data_path, meta_path = self._paths(symbol)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return _normalize(None), None
+        with open(meta_path) as f:
+            coverage = json.load(f)
+        return _normalize(pd.read_parquet(data_path)), coverage
+
+    def _save(self, symbol, df, coverage):
+        data_path, meta_path = self._paths(symbol)
+        # Write then rename, so readers never see a half-written file
+        df.to_parquet(f"{data_path}.tmp")
+        os.replace(f"{data_path}.tmp", data_path)
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(coverage, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+
+def _expects_bars(range_start, range_end):
+    """Whether a date range includes a past weekday, i.e. should contain trading days."""
+    day = range_start
+    last = min(range_end, date.today() - timedelta(days=1))
+    if (last - day).days >= 6:
+        return True
+    while day <= last:
+        if day.weekday() < 5:
+            return True
+        day += timedelta(days=1)
+    return False
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
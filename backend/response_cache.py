@@ -0,0 +1,112 @@
+# SentimentLens/backend/response_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, request
+
+from backend.config import Config
+from backend.database import get_db_connection
+
+
+class ResponseCache:
+    """
+    In-process cache of read-API responses keyed by request and data version.
+    The version comes from the `data_version` table, which the scheduler bumps
+    whenever it commits new sentiment rows; the probe itself is trusted for
+    `ttl` seconds, so repeat polls within that window never touch the database.
+    """
+
+    def __init__(self, ttl, max_entries, max_body_bytes):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+
+    def data_version(self):
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= self.ttl:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT version FROM data_version WHERE id = 1")
+                row = cursor.fetchone()
+            self._version = row[0] if row else 0
+            self._version_checked_at = now
+        return self._version
+
+    @staticmethod
+    def etag_for(key, version):
+        """Strong ETag: the response body is fully determined by request and data version."""
+        return hashlib.sha1(f"{version}|{key}".encode()).hexdigest()
+
+    def serve(self, key, build):
+        """
+        Answers a GET from the cache or with `build()`, adding an ETag and
+        replying 304 Not Modified when the client already has this version.
+        Only 200 responses are cached.
+        """
+        version = self.data_version()
+        etag = self.etag_for(key, version)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            entry = self._get((key, version))
+            if entry is not None:
+                body, mimetype = entry
+                response = Response(body, mimetype=mimetype)
+            else:
+                response = build()
+                if response.status_code != 200:
+                    return response
+                response.response = self._tee(response.response, (key, version), response.mimetype)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._version = None
+
+    def _tee(self, chunks, cache_key, mimetype):
+        """Passes a (possibly streamed) body through, caching it once fully sent."""
+        parts = []
+        size = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                if parts is not None:
+                    parts.append(chunk)
+                    size += len(chunk)
+                    if size > self.max_body_bytes:
+                        parts = None
+                yield chunk
+        finally:
+            # Release the underlying stream (and its connection) if the client went away
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        if parts is not None:
+            self._put(cache_key, (b''.join(parts), mimetype))
+
+    def _get(self, cache_key):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+            return entry
+
+    def _put(self, cache_key, entry):
+        with self._lock:
+            self._entries[cache_key] = entry
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+response_cache = ResponseCache(Config.API_CACHE_TTL, Config.API_CACHE_MAX_ENTRIES, Config.API_CACHE_MAX_BODY_BYTES)
@@ -0,0 +1,108 @@
+# SentimentLens/backend/rollup.py
+
+import argparse
+
+from backend.database import bump_data_version, get_db_connection
+
+# Per-(ticker, day) aggregate of sentiment rows. Scores use the same mapping as
+# the dashboards: positive = 1, neutral = 0, negative = -1.
+_AGGREGATE_SELECT = """
+    SELECT
+        a.ticker_id,
+        a.published_at::date AS day,
+        COUNT(*) FILTER (WHERE s.sentiment = 'positive') AS positive,
+        COUNT(*) FILTER (WHERE s.sentiment = 'negative') AS negative,
+        COUNT(*) FILTER (WHERE s.sentiment = 'neutral') AS neutral,
+        AVG(CASE s.sentiment WHEN 'positive' THEN 1 WHEN 'negative' THEN -1 ELSE 0 END) AS mean_score,
+        COALESCE(AVG(s.confidence), 0) AS mean_confidence
+    FROM sentiment_data s
+    JOIN articles a ON a.id = s.article_id
+    WHERE a.published_at IS NOT NULL
+      AND s.sentiment IN ('positive', 'negative', 'neutral')
+      {extra_condition}
+    GROUP BY a.ticker_id, a.published_at::date
+"""
+
+
+def update_daily_rollup(cursor, sentiment_ids):
+    """
+    Folds newly inserted sentiment rows into `sentiment_daily`. Call in the
+    same transaction as the insert so the rollup never drifts from the rows.
+    """
+    if not sentiment_ids:
+        return
+    cursor.execute(
+        """
+        INSERT INTO sentiment_daily AS d
+            (ticker_id, day, positive, negative, neutral, mean_score, mean_confidence)
+        """ + _AGGREGATE_SELECT.format(extra_condition="AND s.id = ANY(%s)") + """
+        ON CONFLICT (ticker_id, day) DO UPDATE SET
+            positive = d.positive + EXCLUDED.positive,
+            negative = d.negative + EXCLUDED.negative,
+            neutral = d.neutral + EXCLUDED.neutral,
+            mean_score = (
+                d.mean_score * (d.positive + d.negative + d.neutral)
+                + EXCLUDED.mean_score * (EXCLUDED.positive + EXCLUDED.negative + EXCLUDED.neutral)
+            ) / (d.positive + d.negative + d.neutral + EXCLUDED.positive + EXCLUDED.negative + EXCLUDED.neutral),
+            mean_confidence = (
+                d.mean_confidence * (d.positive + d.negative + d.neutral)
+                + EXCLUDED.mean_confidence * (EXCLUDED.positive + EXCLUDED.negative + EXCLUDED.neutral)
+            ) / (d.positive + d.negative + d.neutral + EXCLUDED.positive + EXCLUDED.negative + EXCLUDED.neutral)
+        """,
+        (list(sentiment_ids),)
+    )
+
+
+def rebuild_daily_rollup():
+    """Recomputes `sentiment_daily` from scratch from all sentiment rows."""
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("LOCK TABLE sentiment_daily IN EXCLUSIVE MODE")
+        cursor.execute("DELETE FROM sentiment_daily")
+        cursor.execute(
+            """
+            INSERT INTO sentiment_daily
+                (ticker_id, day, positive, negative, neutral, mean_score, mean_confidence)
+            """ + _AGGREGATE_SELECT.format(extra_condition="")
+        )
+        days = cursor.rowcount
+        bump_data_version(cursor)
+        conn.commit()
+    print(f"Rebuilt daily sentiment rollup ({days} ticker-days).")
+
+
+def fetch_daily_sentiment(symbol, since=None, until=None):
+    """Returns a ticker's daily rollup rows as dicts, oldest day first."""
+    conditions = ["t.symbol = %(symbol)s"]
+    params = {"symbol": symbol}
+    if since is not None:
+        conditions.append("d.day >= %(since)s")
+        params["since"] = since
+    if until is not None:
+        conditions.append("d.day <= %(until)s")
+        params["until"] = until
+
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT d.day, d.positive, d.negative, d.neutral, d.mean_score, d.mean_confidence
+            FROM sentiment_daily d
+            JOIN tickers t ON t.id = d.ticker_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY d.day
+            """,
+            params
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Maintain the daily sentiment rollup table.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the rollup from all sentiment rows.")
+    args = parser.parse_args()
+    if args.rebuild:
+        rebuild_daily_rollup()
+    else:
+        parser.print_help()
@@ -0,0 +1,101 @@
+# SentimentLens/backend/streaming.py
+
+import json
+from datetime import date, datetime
+
+from backend.database import get_db_connection
+
+try:
+    # Optional fast encoder; the standard library is used when it is missing
+    import orjson
+except ImportError:
+    orjson = None
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# Rows fetched per round trip from the server-side cursor
+STREAM_ITERSIZE = 500
+# Bytes buffered before a chunk is handed to the WSGI server
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> bytes:
+    """Serializes to compact JSON bytes, with datetimes as ISO 8601 strings."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=_json_default, separators=(',', ':')).encode()
+
+
+def stream_rows(query, params):
+    """
+    Yields query results as dicts from a server-side cursor, so only
+    STREAM_ITERSIZE rows are held in memory at a time. The pooled connection
+    is returned when the generator is exhausted or closed.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor(name='api_stream') as cursor:
+            cursor.itersize = STREAM_ITERSIZE
+            cursor.execute(query, params)
+            columns = None
+            for row in cursor:
+                if columns is None:
+                    columns = [column[0] for column in cursor.description]
+                yield dict(zip(columns, row))
+
+
+def _chunked(pieces):
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= STREAM_CHUNK_BYTES:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def encode_page(rows, limit, envelope, next_url_for, ndjson=False):
+    """
+    Streams up to `limit` rows as JSON (`{...envelope, "data": [...], "next": url}`)
+    or NDJSON (one row per line, then a `{"next": url}` line if there is more).
+    `rows` may hold one extra row, which only signals that a next page exists;
+    `next_url_for(last_row)` builds the link to that page.
+    """
+    def pieces():
+        last = None
+        count = 0
+        more = False
+        try:
+            if not ndjson:
+                yield dumps(envelope)[:-1] + (b',' if envelope else b'') + b'"data":['
+            for row in rows:
+                if count == limit:
+                    more = True
+                    break
+                if ndjson:
+                    yield dumps(row) + b'\n'
+                else:
+                    yield (b',' if count else b'') + dumps(row)
+                last = row
+                count += 1
+        finally:
+            # Stop the underlying cursor as soon as the page is complete
+            if hasattr(rows, 'close'):
+                rows.close()
+
+        next_url = next_url_for(last) if more else None
+        if ndjson:
+            if next_url:
+                yield dumps({"next": next_url}) + b'\n'
+        else:
+            yield b'],"next":' + dumps(next_url) + b'}'
+
+    return _chunked(pieces())
@@ -0,0 +1,75 @@
+# SentimentLens/backend/ttl_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Bounded in-process cache whose entries expire after `ttl` seconds, with
+    single-flight loading: concurrent misses for the same key wait for one
+    computation instead of each running it.
+    """
+
+    def __init__(self, ttl, max_entries=128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+
+    def get_or_compute(self, key, compute, cacheable=lambda value: True):
+        """
+        Returns the cached value for `key`, or computes it with `compute()`.
+        Values for which `cacheable(value)` is false are returned but not kept.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() < entry[0]:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = {"done": threading.Event()}
+                self.misses += 1
+            else:
+                self.waits += 1
+
+        if not leader:
+            flight["done"].wait()
+            if "error" in flight:
+                raise flight["error"]
+            return flight["value"]
+
+        try:
+            value = compute()
+        except Exception as e:
+            flight["error"] = e
+            raise
+        else:
+            flight["value"] = value
+            if cacheable(value):
+                with self._lock:
+                    self._entries[key] = (time.monotonic() + self.ttl, value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight["done"].set()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "waits": self.waits}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
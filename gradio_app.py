@@ -2,10 +2,14 @@ import gradio as gr
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import yfinance as yf
 import requests
 import os
-from ml.predict import SentimentPredictor
+from ml.registry import registry
+from ml.batcher import MicroBatcher
+from ml.cache import prediction_cache
+from backend.database import get_db_connection
+from backend.price_store import PriceStore
+from backend.ttl_cache import TTLCache
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
@@ -14,7 +18,7 @@ load_dotenv()
 
 # Load the sentiment prediction model
 try:
-    predictor = SentimentPredictor()
+    predictor = registry.warm_up()
     model_loaded = True
     print("Sentiment model loaded successfully.")
 except Exception as e:
@@ -22,8 +26,49 @@ except Exception as e:
     predictor = None
     model_loaded = False
 
+# Daily prices cached on disk per ticker
+price_store = PriceStore()
+
+# Concurrent live-tab requests are coalesced into batched forward passes
+LIVE_CONCURRENCY_LIMIT = int(os.getenv("LIVE_CONCURRENCY_LIMIT", "32"))
+live_batcher = MicroBatcher(
+    predictor,
+    max_batch_size=int(os.getenv("LIVE_BATCH_MAX_SIZE", "32")),
+    max_wait_ms=float(os.getenv("LIVE_BATCH_WAIT_MS", "10")),
+) if model_loaded else None
+
+# Dashboard results per (ticker, days_back); repeat clicks within the TTL cost nothing
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+dashboard_cache = TTLCache(DASHBOARD_CACHE_TTL, max_entries=int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "64")))
+
 # --- Data Fetching and Processing ---
 
+def get_stored_sentiment(urls):
+    """
+    Looks up sentiment the scheduler already stored for these article URLs,
+    preferring the loaded model's scores. Returns {url: prediction}.
+    """
+    if not os.getenv("DATABASE_URL") or not urls:
+        return {}
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT DISTINCT ON (a.url) a.url, s.sentiment, s.confidence
+                FROM articles a
+                JOIN sentiment_data s ON s.article_id = a.id
+                WHERE a.url = ANY(%s)
+                ORDER BY a.url, (s.model_id = %s) DESC, s.id DESC
+                """,
+                (list(urls), predictor.model_id)
+            )
+            rows = cursor.fetchall()
+    except Exception as e:
+        print(f"Could not read stored sentiment, scoring every article: {e}")
+        return {}
+    return {url: {'sentiment': sentiment, 'confidence': confidence} for url, sentiment, confidence in rows}
+
 def get_news_and_sentiment(ticker_symbol, days_back=30):
     """
     Fetches news from NewsAPI, analyzes sentiment, and returns a DataFrame.
@@ -53,18 +98,31 @@ def get_news_and_sentiment(ticker_symbol, days_back=30):
         response.raise_for_status()
         articles = response.json().get('articles', [])
         
-        processed_articles = []
+        articles_to_analyze = []
+        texts_to_analyze = []
         for article in articles:
             text_to_analyze = article.get('content') or article.get('title') or ""
             if text_to_analyze:
-                prediction = predictor.predict(text_to_analyze)
-                processed_articles.append({
-                    'published_at': article['publishedAt'],
-                    'title': article['title'],
-                    'sentiment': prediction['sentiment'],
-                    'confidence': prediction['confidence'],
-                    'url': article['url']
-                })
+                articles_to_analyze.append(article)
+                texts_to_analyze.append(text_to_analyze)
+
+        # Only articles the scheduler hasn't scored yet go through the model
+        stored = get_stored_sentiment([article['url'] for article in articles_to_analyze if article.get('url')])
+        unscored = [i for i, article in enumerate(articles_to_analyze) if article.get('url') not in stored]
+        fresh = prediction_cache.predict_batch(predictor, [texts_to_analyze[i] for i in unscored])
+        predictions = [stored.get(article.get('url')) for article in articles_to_analyze]
+        for i, prediction in zip(unscored, fresh):
+            predictions[i] = prediction
+
+        processed_articles = []
+        for article, prediction in zip(articles_to_analyze, predictions):
+            processed_articles.append({
+                'published_at': article['publishedAt'],
+                'title': article['title'],
+                'sentiment': prediction['sentiment'],
+                'confidence': prediction['confidence'],
+                'url': article['url']
+            })
         
         df = pd.DataFrame(processed_articles)
         if not df.empty:
@@ -75,40 +133,72 @@ def get_news_and_sentiment(ticker_symbol, days_back=30):
         print(f"Error fetching news from NewsAPI: {e}")
         return pd.DataFrame()
 
+def predict_live_text(text):
+    """Scores the text entered in the live analysis tab."""
+    if not model_loaded:
+        return {"Error": "Model not loaded"}
+    return live_batcher.predict(text)
+
 def get_stock_data(ticker_symbol, days_back=30):
-    """Fetches historical stock data from Yahoo Finance."""
+    """Historical daily prices, from the local price store (only missing days are downloaded)."""
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days_back)
     try:
-        stock = yf.Ticker(ticker_symbol)
-        hist = stock.history(start=start_date, end=end_date)
-        return hist
+        return price_store.get_history(ticker_symbol, start_date, end_date)
     except Exception as e:
         print(f"Error fetching stock data for {ticker_symbol} from yfinance: {e}")
         return pd.DataFrame()
 
+def get_daily_sentiment(sentiment_df):
+    """
+    Daily sentiment counts and mean score, indexed by date, aggregated from
+    the same articles the news table and click filter show, so the charts
+    and the table always agree on days and counts.
+    """
+    sentiment_mapping = {'positive': 1, 'neutral': 0, 'negative': -1}
+    dates = sentiment_df['published_at'].dt.date
+    daily = pd.crosstab(dates, sentiment_df['sentiment']).reindex(
+        columns=['positive', 'negative', 'neutral'], fill_value=0
+    )
+    daily['mean_score'] = sentiment_df['sentiment'].map(sentiment_mapping).groupby(dates).mean()
+    daily.index = pd.to_datetime(daily.index)
+    return daily
+
 # --- Visualization & Interactivity Functions ---
 
+def load_dashboard_data(ticker_symbol, days_back=30):
+    """
+    Returns (sentiment_df, stock_df, daily_sentiment) for a ticker, served from
+    the TTL cache. Concurrent identical requests share one load, and empty
+    results (e.g. a NewsAPI error) are not cached.
+    """
+    ticker_symbol = ticker_symbol.strip().upper()
+    days_back = int(days_back)
+
+    def load():
+        sentiment_df = get_news_and_sentiment(ticker_symbol, days_back)
+        if sentiment_df.empty:
+            return sentiment_df, None, None
+        stock_df = get_stock_data(ticker_symbol, days_back)
+        return sentiment_df, stock_df, get_daily_sentiment(sentiment_df)
+
+    return dashboard_cache.get_or_compute(
+        (ticker_symbol, days_back), load, cacheable=lambda data: not data[0].empty
+    )
+
 def create_sentiment_dashboard(ticker_symbol, days_back=30):
     """
     Generates all plots and data for the main dashboard tab.
     Also returns the full sentiment dataframe to be stored for interactivity.
     """
     # Fetch data
-    sentiment_df = get_news_and_sentiment(ticker_symbol, days_back)
-    stock_df = get_stock_data(ticker_symbol, days_back)
+    sentiment_df, stock_df, daily_sentiment = load_dashboard_data(ticker_symbol, days_back)
 
     if sentiment_df.empty:
         # Return empty state if no data is found
         return None, None, None, pd.DataFrame(columns=["Date", "Title", "Sentiment", "Confidence", "Link"]), pd.DataFrame()
 
     # --- Chart 1: Sentiment vs. Stock Price ---
-    sentiment_df['date'] = sentiment_df['published_at'].dt.date
-    sentiment_mapping = {'positive': 1, 'neutral': 0, 'negative': -1}
-    sentiment_df['sentiment_score'] = sentiment_df['sentiment'].map(sentiment_mapping)
-    
-    daily_avg_sentiment = sentiment_df.groupby('date')['sentiment_score'].mean().reset_index()
-    daily_avg_sentiment['date'] = pd.to_datetime(daily_avg_sentiment['date'])
 
     fig_price_sentiment = make_subplots(specs=[[{"secondary_y": True}]])
     
@@ -119,7 +209,7 @@ def create_sentiment_dashboard(ticker_symbol, days_back=30):
     )
     # Add Sentiment Score Trace
     fig_price_sentiment.add_trace(
-        go.Bar(x=daily_avg_sentiment['date'], y=daily_avg_sentiment['sentiment_score'], name='Avg. Sentiment Score', marker_color='lightcoral', opacity=0.6),
+        go.Bar(x=daily_sentiment.index, y=daily_sentiment['mean_score'], name='Avg. Sentiment Score', marker_color='lightcoral', opacity=0.6),
         secondary_y=True,
     )
     fig_price_sentiment.update_layout(
@@ -132,14 +222,13 @@ def create_sentiment_dashboard(ticker_symbol, days_back=30):
 
 
     # --- Chart 2: Daily Sentiment Breakdown ---
-    daily_counts = sentiment_df.groupby([sentiment_df['published_at'].dt.date, 'sentiment']).size().unstack(fill_value=0)
     fig_daily_breakdown = go.Figure()
     colors = {'positive': 'green', 'negative': 'red', 'neutral': 'grey'}
     for sentiment in ['positive', 'negative', 'neutral']:
-        if sentiment in daily_counts.columns:
+        if daily_sentiment[sentiment].any():
             fig_daily_breakdown.add_trace(go.Bar(
-                x=daily_counts.index,
-                y=daily_counts[sentiment],
+                x=daily_sentiment.index,
+                y=daily_sentiment[sentiment],
                 name=sentiment.capitalize(),
                 marker_color=colors[sentiment]
             ))
@@ -263,10 +352,12 @@ with gr.Blocks(theme=gr.themes.Soft(), title="SentimentLens") as demo:
         outputs=[price_sentiment_plot, daily_breakdown_plot, pie_chart, news_output, full_sentiment_data]
     )
     
+    # Many live requests may run at once so the batcher can group them
     live_analyze_button.click(
-        fn=predictor.predict if model_loaded else lambda x: {"Error": "Model not loaded"},
+        fn=predict_live_text,
         inputs=live_text_input,
-        outputs=live_output
+        outputs=live_output,
+        concurrency_limit=LIVE_CONCURRENCY_LIMIT
     )
     
     # NEW: Event handler for making the plot interactive
@@ -0,0 +1,104 @@
+# SentimentLens/ml/batcher.py
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Thread-safe dynamic batcher in front of a SentimentPredictor. Concurrent
+    callers enqueue single texts; a dispatcher thread waits up to
+    `max_wait_ms` after the first request (or until `max_batch_size` are
+    queued), runs one batched forward pass and hands each caller its result.
+    """
+
+    def __init__(self, predictor, max_batch_size=32, max_wait_ms=10):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        # Metrics
+        self.requests = 0
+        self.batches = 0
+        self.requests_batched = 0
+        self.max_queue_depth = 0
+        self.max_batch_seen = 0
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queues one text and returns a Future resolving to its prediction."""
+        future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("MicroBatcher is stopped.")
+            self._pending.append((text, future))
+            self.requests += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+            self._cond.notify()
+        return future
+
+    def predict(self, text, timeout=None):
+        """Blocking single prediction, batched with whatever else is in flight."""
+        return self.submit(text).result(timeout)
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self.max_queue_depth,
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": self.requests_batched / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+            }
+
+    def stop(self):
+        """Stops the dispatcher after the queued requests have been answered."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._stopped:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            # Give concurrent callers a moment to join the batch
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            count = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(count)]
+            self.batches += 1
+            self.requests_batched += count
+            self.max_batch_seen = max(self.max_batch_seen, count)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            texts = [text for text, _ in batch]
+            try:
+                predictions = self.predictor.predict_batch(texts, batch_size=len(texts))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), prediction in zip(batch, predictions):
+                future.set_result(prediction)
@@ -0,0 +1,162 @@
+# SentimentLens/ml/cache.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from backend.database import get_db_connection
+from ml.preprocess import clean_text
+
+
+def text_hash(text: str) -> str:
+    """Hashes the normalized text so syndicated copies of a story share a key."""
+    return hashlib.sha256(clean_text(text).encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    Two-tier cache of sentiment predictions keyed by (normalized text hash, model id):
+    a bounded in-memory LRU in front of the `prediction_cache` database table.
+    """
+
+    def __init__(self, max_size=10000, persistent=None):
+        self.max_size = max_size
+        # The persistent tier needs a database; the Gradio Space may not have one
+        self.persistent = bool(os.environ.get("DATABASE_URL")) if persistent is None else persistent
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def predict_batch(self, predictor, texts, batch_size: int = 32):
+        """Returns predictions for `texts`, running the model only on cache misses."""
+        results = [None] * len(texts)
+        pending = {}  # key -> indices of texts waiting on that key
+        for i, text in enumerate(texts):
+            if not text or not isinstance(text, str) or not clean_text(text):
+                # Nothing meaningful to key on; let the predictor handle it
+                pending.setdefault(("", i), []).append(i)
+                continue
+            key = (text_hash(text), predictor.model_id)
+            cached = self._get(key)
+            if cached is not None:
+                results[i] = dict(cached)
+            else:
+                pending.setdefault(key, []).append(i)
+
+        with self._lock:
+            self.hits += len(texts) - sum(len(indices) for indices in pending.values())
+
+        if not pending:
+            return results
+
+        cacheable = [key for key in pending if key[0]]
+        if self.persistent and cacheable:
+            for key, prediction in self._load_persistent(predictor.model_id, cacheable).items():
+                self._put(key, prediction)
+                indices = pending.pop(key)
+                for i in indices:
+                    results[i] = dict(prediction)
+                with self._lock:
+                    self.persistent_hits += len(indices)
+
+        # Score each distinct missing text once
+        keys = list(pending)
+        predictions = predictor.predict_batch([texts[pending[key][0]] for key in keys], batch_size=batch_size)
+        new_entries = {}
+        for key, prediction in zip(keys, predictions):
+            for i in pending[key]:
+                results[i] = dict(prediction)
+            if key[0]:
+                self._put(key, prediction)
+                new_entries[key] = prediction
+
+        with self._lock:
+            self.misses += sum(1 for key in keys if key[0])
+
+        if self.persistent and new_entries:
+            self._store_persistent(new_entries)
+
+        return results
+
+    def stats(self):
+        """
+        Returns counters for monitoring: `hits` and `persistent_hits` count texts
+        served from memory and from the table, `misses` counts distinct texts scored.
+        """
+        with self._lock:
+            served = self.hits + self.persistent_hits
+            lookups = served + self.misses
+            return {
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": served / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key):
+        with self._lock:
+            prediction = self._entries.get(key)
+            if prediction is not None:
+                self._entries.move_to_end(key)
+            return prediction
+
+    def _put(self, key, prediction):
+        with self._lock:
+            self._entries[key] = dict(prediction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _load_persistent(self, model_id, keys):
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT text_hash, sentiment, confidence
+                    FROM prediction_cache
+                    WHERE model_id = %s AND text_hash = ANY(%s)
+                    """,
+                    (model_id, [key[0] for key in keys])
+                )
+                return {
+                    (row[0], model_id): {"sentiment": row[1], "confidence": row[2]}
+                    for row in cursor.fetchall()
+                }
+        except psycopg2.Error as e:
+            print(f"Prediction cache lookup failed, continuing without it: {e}")
+            return {}
+
+    def _store_persistent(self, entries):
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                execute_values(
+                    cursor,
+                    """
+                    INSERT INTO prediction_cache (text_hash, model_id, sentiment, confidence)
+                    VALUES %s
+                    ON CONFLICT (text_hash, model_id) DO NOTHING
+                    """,
+                    [
+                        (key[0], key[1], prediction["sentiment"], prediction["confidence"])
+                        for key, prediction in entries.items()
+                    ]
+                )
+                conn.commit()
+        except psycopg2.Error as e:
+            print(f"Prediction cache write failed: {e}")
+
+
+prediction_cache = PredictionCache(max_size=int(os.getenv("PREDICTION_CACHE_SIZE", "10000")))
@@ -0,0 +1,49 @@
+# SentimentLens/ml/export_onnx.py
+
+import argparse
+import os
+
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from ml.predict import DEFAULT_ONNX_PATH, resolve_model
+
+
+def export_onnx(local_model_path="fine_tuned_finbert", output_path=DEFAULT_ONNX_PATH, opset=14):
+    """Exports the sentiment model to an ONNX graph with dynamic batch and sequence axes."""
+    model_to_load, _ = resolve_model(local_model_path)
+    print(f"Exporting '{model_to_load}' to ONNX at '{output_path}'...")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_to_load)
+    model = AutoModelForSequenceClassification.from_pretrained(model_to_load)
+    model.eval()
+
+    sample = tokenizer(
+        ["The company reported a significant increase in profits this quarter."],
+        return_tensors="pt"
+    )
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            output_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    print(f"ONNX export complete ({os.path.getsize(output_path) / (1024 * 1024):.1f} MB).")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export the sentiment model to ONNX.")
+    parser.add_argument("--model-path", default="fine_tuned_finbert")
+    parser.add_argument("--output", default=DEFAULT_ONNX_PATH)
+    parser.add_argument("--opset", type=int, default=14)
+    args = parser.parse_args()
+    export_onnx(args.model_path, args.output, args.opset)
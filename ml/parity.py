@@ -0,0 +1,72 @@
+# SentimentLens/ml/parity.py
+
+import argparse
+import sys
+import time
+
+from ml.predict import BACKENDS, DEFAULT_ONNX_PATH, SentimentPredictor
+from ml.train import load_and_prepare_data
+
+
+def timed_predictions(predictor, texts, batch_size):
+    start = time.perf_counter()
+    predictions = predictor.predict_batch(texts, batch_size=batch_size)
+    return predictions, time.perf_counter() - start
+
+
+def check_parity(backend, model_path="fine_tuned_finbert", onnx_path=DEFAULT_ONNX_PATH,
+                 data_path='ml/financial_phrasebank.csv', limit=None, batch_size=32):
+    """
+    Compares a candidate backend against fp32 torch on the Financial PhraseBank:
+    label agreement, confidence drift, accuracy on the gold labels and latency.
+    """
+    df = load_and_prepare_data(data_path)
+    if limit:
+        df = df.sample(n=min(limit, len(df)), random_state=42)
+    texts = df['text'].tolist()
+    gold = df['sentiment'].astype(str).tolist()
+
+    reference = SentimentPredictor(model_path, backend="torch")
+    candidate = SentimentPredictor(model_path, backend=backend, onnx_path=onnx_path)
+
+    reference_preds, reference_seconds = timed_predictions(reference, texts, batch_size)
+    candidate_preds, candidate_seconds = timed_predictions(candidate, texts, batch_size)
+
+    agree = [r['sentiment'] == c['sentiment'] for r, c in zip(reference_preds, candidate_preds)]
+    drift = [abs(r['confidence'] - c['confidence'])
+             for r, c, same in zip(reference_preds, candidate_preds, agree) if same]
+
+    return {
+        "backend": backend,
+        "samples": len(texts),
+        "label_agreement": sum(agree) / len(agree),
+        "mean_confidence_drift": sum(drift) / len(drift) if drift else 0.0,
+        "max_confidence_drift": max(drift) if drift else 0.0,
+        "reference_accuracy": sum(p['sentiment'] == g for p, g in zip(reference_preds, gold)) / len(gold),
+        "candidate_accuracy": sum(p['sentiment'] == g for p, g in zip(candidate_preds, gold)) / len(gold),
+        "speedup": reference_seconds / candidate_seconds if candidate_seconds else float('inf'),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check a CPU inference backend against fp32 torch.")
+    parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "torch"], default="int8")
+    parser.add_argument("--model-path", default="fine_tuned_finbert")
+    parser.add_argument("--onnx-path", default=DEFAULT_ONNX_PATH)
+    parser.add_argument("--data", default='ml/financial_phrasebank.csv')
+    parser.add_argument("--limit", type=int, default=None, help="Score a random sample of this many rows.")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-agreement", type=float, default=0.99)
+    parser.add_argument("--max-drift", type=float, default=0.02)
+    args = parser.parse_args()
+
+    report = check_parity(args.backend, args.model_path, args.onnx_path, args.data, args.limit, args.batch_size)
+    print("\n--- Backend Parity Report ---")
+    for key, value in report.items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+    print("-----------------------------")
+
+    passed = (report["label_agreement"] >= args.min_agreement
+              and report["mean_confidence_drift"] <= args.max_drift)
+    print("Parity check PASSED." if passed else "Parity check FAILED.")
+    sys.exit(0 if passed else 1)
@@ -5,70 +5,167 @@ from transformers import (
 )
 import torch
 import torch.nn.functional as F
+import io
 import os
+import threading
+
+def model_fingerprint(model_path):
+    """
+    Returns a cheap fingerprint of a local model directory (latest mtime of its
+    files), or None when the directory does not exist and the Hub is used.
+    """
+    if not os.path.isdir(model_path):
+        return None
+    latest = os.path.getmtime(model_path)
+    for entry in os.scandir(model_path):
+        if entry.is_file():
+            latest = max(latest, entry.stat().st_mtime)
+    return latest
+
+BACKENDS = ("torch", "int8", "onnx")
+DEFAULT_ONNX_PATH = "finbert_onnx/model.onnx"
+
+def resolve_model(local_model_path="fine_tuned_finbert"):
+    """Returns the model name/path to load and its label mapping."""
+    if os.path.isdir(local_model_path):
+        # The label mapping for our fine-tuned model
+        return local_model_path, {0: 'neutral', 1: 'positive', 2: 'negative'}
+    # The label mapping for the default pre-trained model
+    return "ProsusAI/finbert", {0: 'positive', 1: 'negative', 2: 'neutral'}
 
 class SentimentPredictor:
-    def __init__(self, local_model_path="fine_tuned_finbert"):
-        
+    def __init__(self, local_model_path="fine_tuned_finbert", revision=None, backend="torch", onnx_path=DEFAULT_ONNX_PATH):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}'. Choose one of {BACKENDS}.")
+
         # --- CORRECTED LOGIC ---
         # First, decide which model to use based on whether the local directory exists.
-        if os.path.isdir(local_model_path):
+        model_to_load, self.label_map = resolve_model(local_model_path)
+        if model_to_load == local_model_path:
             print(f"Found local fine-tuned model at '{local_model_path}'. Loading...")
-            model_to_load = local_model_path
-            # The label mapping for our fine-tuned model
-            self.label_map = {0: 'neutral', 1: 'positive', 2: 'negative'} 
         else:
             print(f"Local model not found at '{local_model_path}'.")
             print("Falling back to pre-trained 'ProsusAI/finbert' from Hugging Face Hub.")
-            model_to_load = "ProsusAI/finbert"
-            # The label mapping for the default pre-trained model
-            self.label_map = {0: 'positive', 1: 'negative', 2: 'neutral'}
+
+        self.model_name = model_to_load
+        self.revision = revision
+        self.backend = backend
+        # Hugging Face fast tokenizers are not thread-safe ("Already borrowed"), and
+        # the pipeline threads, the live batcher and dashboard requests share one predictor
+        self._lock = threading.Lock()
+        # Identifies the exact weights in use, e.g. for caching predictions
+        fingerprint = model_fingerprint(local_model_path)
+        self.model_id = f"{model_to_load}@{revision or 'default'}"
+        if fingerprint is not None:
+            self.model_id += f"#{int(fingerprint)}"
+        if backend != "torch":
+            self.model_id += f"[{backend}]"
 
         # Now, load the tokenizer and model using the determined path/name
+        load_kwargs = {"revision": revision} if revision else {}
+        self.model = None
+        self.session = None
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(model_to_load)
-            self.model = AutoModelForSequenceClassification.from_pretrained(model_to_load)
+            self.tokenizer = AutoTokenizer.from_pretrained(model_to_load, **load_kwargs)
+            if backend == "onnx":
+                # Optional dependency, only needed for the ONNX backend
+                import onnxruntime as ort
+                self.session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+                self.session_inputs = {i.name for i in self.session.get_inputs()}
+            else:
+                self.model = AutoModelForSequenceClassification.from_pretrained(model_to_load, **load_kwargs)
         except Exception as e:
             print(f"An error occurred while loading the model: {e}")
             raise
 
-        # Set up the device (GPU or CPU) and put the model in evaluation mode
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.model.to(self.device)
-        self.model.eval()
-        print(f"Model loaded successfully on device: {self.device}")
+        # Set up the device (GPU or CPU) and put the model in evaluation mode.
+        # The quantized and ONNX backends are CPU-only.
+        if backend == "torch" and torch.cuda.is_available():
+            self.device = "cuda"
+        else:
+            self.device = "cpu"
+
+        if backend == "onnx":
+            self._footprint = os.path.getsize(onnx_path)
+        else:
+            self.model.to(self.device)
+            self.model.eval()
+            if backend == "int8":
+                self.model = torch.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                # Packed int8 weights are not exposed as parameters, so measure the serialized size
+                buffer = io.BytesIO()
+                torch.save(self.model.state_dict(), buffer)
+                self._footprint = buffer.tell()
+            else:
+                tensors = list(self.model.parameters()) + list(self.model.buffers())
+                self._footprint = sum(t.numel() * t.element_size() for t in tensors)
+        print(f"Model loaded successfully on device: {self.device} (backend: {backend})")
+
 
+    def memory_footprint(self) -> int:
+        """Returns the approximate size in bytes of the loaded model weights."""
+        return self._footprint
 
     def predict(self, text: str):
-        if not text or not isinstance(text, str):
-            return {"sentiment": "neutral", "confidence": 1.0}
-
-        # Tokenize the input text
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=512
-        ).to(self.device)
-
-        # Get model predictions
+        return self.predict_batch([text], batch_size=1)[0]
+
+    def predict_batch(self, texts, batch_size: int = 32):
+        """
+        Predicts sentiment for a list of texts, returning results in input order.
+        Texts are sorted by token length and each batch is padded only to its
+        own longest sequence, so short headlines don't pay for long articles.
+        """
+        results = [None] * len(texts)
+        valid = []
+        for i, text in enumerate(texts):
+            if not text or not isinstance(text, str):
+                results[i] = {"sentiment": "neutral", "confidence": 1.0}
+            else:
+                valid.append(i)
+
+        if not valid:
+            return results
+
+        with self._lock:
+            # Tokenize once without padding; padding happens per batch below
+            encodings = self.tokenizer(
+                [texts[i] for i in valid],
+                truncation=True,
+                max_length=512
+            )
+            order = sorted(range(len(valid)), key=lambda k: len(encodings['input_ids'][k]))
+
+            for start in range(0, len(order), batch_size):
+                chunk = order[start:start + batch_size]
+                features = [{key: encodings[key][k] for key in encodings.keys()} for k in chunk]
+                inputs = self.tokenizer.pad(
+                    features,
+                    padding='longest',
+                    return_tensors="pt"
+                )
+
+                # Convert logits to probabilities and take the top prediction
+                probs = F.softmax(self._logits(inputs), dim=-1)
+                confidences, predicted_class_ids = torch.max(probs, dim=1)
+
+                for k, confidence, class_id in zip(chunk, confidences.tolist(), predicted_class_ids.tolist()):
+                    results[valid[k]] = {
+                        "sentiment": self.label_map.get(class_id, "unknown"),
+                        "confidence": confidence
+                    }
+
+        return results
+
+    def _logits(self, inputs):
+        """Runs one forward pass on the configured backend."""
+        if self.session is not None:
+            feed = {name: tensor.numpy() for name, tensor in inputs.items() if name in self.session_inputs}
+            return torch.from_numpy(self.session.run(["logits"], feed)[0])
+
         with torch.no_grad():
-            outputs = self.model(**inputs)
-
-        # Convert logits to probabilities
-        probs = F.softmax(outputs.logits, dim=-1)
-        
-        # Get the top prediction
-        confidence, predicted_class_id = torch.max(probs, dim=1)
-        
-        # Map the prediction ID to the sentiment label
-        sentiment = self.label_map.get(predicted_class_id.item(), "unknown")
-
-        return {
-            "sentiment": sentiment,
-            "confidence": confidence.item()
-        }
+            return self.model(**inputs.to(self.device)).logits
 
 # Example usage for testing the script directly
 if __name__ == '__main__':
@@ -1,22 +1,129 @@
 # SentimentLens/ml/preprocess.py
 
+import json
+import os
 import re
+import threading
+import time
+
+# Optional JSON rule file: {"keywords": [...], "tickers": {"AAPL": {"add": [...], "remove": [...]}}}
+NOISE_RULES_PATH = os.getenv("NOISE_RULES_PATH")
+# Minimum seconds between checks of the rule file's mtime
+NOISE_RULES_CHECK_SECONDS = float(os.getenv("NOISE_RULES_CHECK_SECONDS", "5"))
+
+# Keywords that often indicate non-actionable news
+DEFAULT_NOISE_KEYWORDS = [
+    'quarterly report', 'earnings call', 'insider transaction',
+    'analyst rating', 'dividend', 'stock split', 'rumor',
+    'market update', 'daily brief'
+]
+
+
+def compile_keywords(keywords):
+    """
+    Compiles keywords into one regex whose alternation is factored into a
+    trie, so a match attempt walks shared prefixes once instead of trying
+    every keyword; the cost stays roughly flat as the list grows. Matches
+    lowercase text. Returns None for an empty list.
+    """
+    trie = {}
+    for keyword in keywords:
+        keyword = keyword.strip().lower()
+        if not keyword:
+            continue
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+    if not trie:
+        return None
+    return re.compile(_trie_pattern(trie))
+
+
+def _trie_pattern(node):
+    # A node that ends a keyword matches as soon as it is reached: any longer
+    # keyword sharing this prefix would also contain it
+    if '' in node:
+        return ''
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items())]
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
 
 class RuleBasedFilter:
-    def __init__(self):
-        # Keywords that often indicate non-actionable news
-        self.noise_keywords = [
-            'quarterly report', 'earnings call', 'insider transaction',
-            'analyst rating', 'dividend', 'stock split', 'rumor',
-            'market update', 'daily brief'
-        ]
-
-    def is_noisy(self, headline: str) -> bool:
-        headline_lower = headline.lower()
-        for keyword in self.noise_keywords:
-            if keyword in headline_lower:
-                return True
-        return False
+    def __init__(self, noise_keywords=None, rules_path=NOISE_RULES_PATH):
+        self.rules_path = rules_path
+        self._lock = threading.Lock()
+        self._rules_mtime = None
+        self._checked_at = float('-inf')
+        self._set_rules(list(noise_keywords or DEFAULT_NOISE_KEYWORDS), {})
+        self._maybe_reload()
+
+    @property
+    def noise_keywords(self):
+        return self._rules[0]
+
+    def is_noisy(self, headline: str, ticker: str = None) -> bool:
+        pattern = self._pattern_for(ticker)
+        return bool(headline) and pattern is not None and pattern.search(headline.lower()) is not None
+
+    def is_noisy_batch(self, headlines, ticker: str = None):
+        """
+        Flags a whole list or pandas Series of headlines with the compiled
+        matcher. Returns a boolean Series for a Series, else a list of bools.
+        """
+        pattern = self._pattern_for(ticker)
+        if hasattr(headlines, 'str') and hasattr(headlines, 'index'):
+            if pattern is None:
+                return headlines.map(lambda _: False).astype(bool)
+            return headlines.fillna('').astype(str).str.lower().str.contains(pattern, regex=True)
+        if pattern is None:
+            return [False] * len(headlines)
+        search = pattern.search
+        return [bool(headline) and search(headline.lower()) is not None for headline in headlines]
+
+    def _pattern_for(self, ticker):
+        self._maybe_reload()
+        keywords, overrides, patterns = self._rules
+        key = ticker.upper() if ticker else None
+        if key not in overrides:
+            return patterns[None]
+        if key not in patterns:
+            override = overrides[key]
+            removed = {k.lower() for k in override.get('remove', [])}
+            patterns[key] = compile_keywords(
+                [k for k in keywords if k.lower() not in removed] + list(override.get('add', []))
+            )
+        return patterns[key]
+
+    def _set_rules(self, keywords, overrides):
+        # Swapped as one tuple so concurrent readers see either the old or the new rules
+        overrides = {symbol.upper(): rules for symbol, rules in overrides.items()}
+        self._rules = (keywords, overrides, {None: compile_keywords(keywords)})
+
+    def _maybe_reload(self):
+        """Reloads the rule file if it changed, checking at most every NOISE_RULES_CHECK_SECONDS."""
+        if not self.rules_path:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < NOISE_RULES_CHECK_SECONDS:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.rules_path)
+                if mtime == self._rules_mtime:
+                    return
+                with open(self.rules_path) as f:
+                    rules = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not load noise rules from '{self.rules_path}': {e}")
+                return
+            self._rules_mtime = mtime
+            self._set_rules(list(rules.get('keywords', self.noise_keywords)), rules.get('tickers', {}))
+            print(f"Loaded {len(self.noise_keywords)} noise keywords and {len(self._rules[1])} ticker overrides "
+                  f"from '{self.rules_path}'.")
 
 def clean_text(text: str) -> str:
     text = text.lower()
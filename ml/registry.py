@@ -0,0 +1,97 @@
+# SentimentLens/ml/registry.py
+
+import os
+import resource
+import threading
+
+# ml.predict pulls in torch and transformers; it is imported on first load so
+# processes that only serve stored data (e.g. the API) never pay for it.
+
+DEFAULT_MODEL_PATH = os.getenv("SENTIMENT_MODEL_PATH", "fine_tuned_finbert")
+DEFAULT_MODEL_REVISION = os.getenv("SENTIMENT_MODEL_REVISION") or None
+# One of ml.predict.BACKENDS: "torch" (fp32), "int8" (dynamic quantization) or "onnx"
+DEFAULT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+# Defaults to ml.predict.DEFAULT_ONNX_PATH when unset
+ONNX_PATH = os.getenv("SENTIMENT_ONNX_PATH") or None
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded SentimentPredictor instances keyed by
+    (model path, revision, backend), so the weights are loaded once per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._predictors = {}
+        self._fingerprints = {}
+
+    def get(self, model_path=DEFAULT_MODEL_PATH, revision=DEFAULT_MODEL_REVISION, backend=DEFAULT_BACKEND):
+        key = (model_path, revision, backend)
+        predictor = self._predictors.get(key)
+        if predictor is None:
+            with self._lock:
+                predictor = self._predictors.get(key)
+                if predictor is None:
+                    predictor = self._load(key)
+        return predictor
+
+    def reload(self, model_path=DEFAULT_MODEL_PATH, revision=DEFAULT_MODEL_REVISION, backend=DEFAULT_BACKEND):
+        """Loads the model again, replacing any cached copy."""
+        with self._lock:
+            return self._load((model_path, revision, backend))
+
+    def reload_if_changed(self, model_path=DEFAULT_MODEL_PATH, revision=DEFAULT_MODEL_REVISION, backend=DEFAULT_BACKEND):
+        """
+        Reloads the model if the local model directory appeared or changed since
+        it was loaded (e.g. a new fine_tuned_finbert was trained). Returns the
+        current predictor either way.
+        """
+        from ml.predict import model_fingerprint
+
+        key = (model_path, revision, backend)
+        if key in self._predictors and self._fingerprints.get(key) != model_fingerprint(model_path):
+            print(f"Detected a new model at '{model_path}'. Reloading...")
+            return self.reload(model_path, revision, backend)
+        return self.get(model_path, revision, backend)
+
+    def warm_up(self, model_path=DEFAULT_MODEL_PATH, revision=DEFAULT_MODEL_REVISION, backend=DEFAULT_BACKEND):
+        """Loads the model and runs one prediction so the first real call is fast."""
+        predictor = self.get(model_path, revision, backend)
+        predictor.predict("Warm-up sentence for the sentiment model.")
+        return predictor
+
+    def memory_report(self):
+        """Reports the weight footprint of each loaded model and the process peak RSS."""
+        models = {
+            f"{path}@{revision or 'default'}[{backend}]": predictor.memory_footprint()
+            for (path, revision, backend), predictor in self._predictors.items()
+        }
+        return {
+            "models": models,
+            "total_model_bytes": sum(models.values()),
+            # ru_maxrss is reported in kilobytes on Linux
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        }
+
+    def _load(self, key):
+        from ml.predict import DEFAULT_ONNX_PATH, SentimentPredictor, model_fingerprint
+
+        model_path, revision, backend = key
+        fingerprint = model_fingerprint(model_path)
+        predictor = SentimentPredictor(
+            model_path, revision=revision, backend=backend, onnx_path=ONNX_PATH or DEFAULT_ONNX_PATH
+        )
+        self._predictors[key] = predictor
+        self._fingerprints[key] = fingerprint
+        footprint_mb = predictor.memory_footprint() / (1024 * 1024)
+        print(f"Registered sentiment model '{predictor.model_name}' ({footprint_mb:.1f} MB of weights).")
+        return predictor
+
+
+registry = ModelRegistry()
+
+
+def get_predictor(model_path=DEFAULT_MODEL_PATH, revision=DEFAULT_MODEL_REVISION, backend=DEFAULT_BACKEND):
+    """Returns the shared predictor for this process, loading it on first use."""
+    return registry.get(model_path, revision, backend)
@@ -0,0 +1,181 @@
+# SentimentLens/scripts/alert_engine.py
+
+import operator
+from datetime import datetime, timedelta
+
+from backend.config import Config
+
+# Naive UTC "now", matching how NewsAPI publishedAt values are stored
+UTC_NOW = "(CURRENT_TIMESTAMP AT TIME ZONE 'UTC')"
+
+
+class AlertRule:
+    """A threshold on one metric of a ticker's sliding-window counters."""
+
+    def __init__(self, name, description, metric, comparison, threshold, min_articles=1):
+        self.name = name
+        self.description = description
+        self.metric = metric
+        self.comparison = comparison
+        self.threshold = threshold
+        self.min_articles = min_articles
+
+    def evaluate(self, window):
+        """Returns (value, breached) for a window dict with total/negative/weighted_score."""
+        if window['total'] < self.min_articles:
+            return None, False
+        value = self.metric(window)
+        return value, self.comparison(value, self.threshold)
+
+
+ALERT_RULES = [
+    AlertRule(
+        "negative_count", "negative articles",
+        lambda w: w['negative'], operator.ge, Config.ALERT_NEGATIVE_COUNT
+    ),
+    AlertRule(
+        "negative_ratio", "share of negative articles",
+        lambda w: w['negative'] / w['total'], operator.ge, Config.ALERT_NEGATIVE_RATIO,
+        min_articles=Config.ALERT_MIN_ARTICLES
+    ),
+    AlertRule(
+        "weighted_score", "confidence-weighted sentiment score",
+        lambda w: w['weighted_score'] / w['total'], operator.le, Config.ALERT_WEIGHTED_SCORE,
+        min_articles=Config.ALERT_MIN_ARTICLES
+    ),
+]
+
+
+def record_alert_events(cursor, sentiment_ids):
+    """
+    Adds newly inserted sentiment rows to the per-ticker hourly window buckets
+    and marks their tickers for evaluation. Call in the inserting transaction;
+    the cost is proportional to the new rows, not to history.
+    """
+    if not sentiment_ids:
+        return
+    cursor.execute(
+        f"""
+        WITH touched AS (
+            INSERT INTO alert_window_buckets AS b (ticker_id, bucket_start, total, negative, weighted_score)
+            SELECT
+                a.ticker_id,
+                date_trunc('hour', a.published_at),
+                COUNT(*),
+                COUNT(*) FILTER (WHERE s.sentiment = 'negative'),
+                SUM(CASE s.sentiment WHEN 'positive' THEN 1 WHEN 'negative' THEN -1 ELSE 0 END
+                    * COALESCE(s.confidence, 0))
+            FROM sentiment_data s
+            JOIN articles a ON a.id = s.article_id
+            WHERE s.id = ANY(%(ids)s)
+              AND a.published_at >= {UTC_NOW} - %(window_hours)s * INTERVAL '1 hour'
+            GROUP BY a.ticker_id, date_trunc('hour', a.published_at)
+            ON CONFLICT (ticker_id, bucket_start) DO UPDATE SET
+                total = b.total + EXCLUDED.total,
+                negative = b.negative + EXCLUDED.negative,
+                weighted_score = b.weighted_score + EXCLUDED.weighted_score
+            RETURNING b.ticker_id
+        )
+        INSERT INTO alert_dirty_tickers (ticker_id)
+        SELECT DISTINCT ticker_id FROM touched
+        ON CONFLICT (ticker_id) DO NOTHING
+        """,
+        {"ids": list(sentiment_ids), "window_hours": Config.ALERT_WINDOW_HOURS}
+    )
+
+
+def evaluate_alerts(conn, alerter):
+    """
+    Evaluates the rules for tickers whose window changed since the last run:
+    those that received new sentiment or had buckets expire, plus every ticker
+    with an active rule, so a breach that ages out of the window re-arms even
+    when no new articles arrive. A rule fires once when it becomes breached,
+    re-arms when it clears, and never fires twice for a ticker within the
+    cooldown. Returns the number of alerts sent.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM alert_dirty_tickers RETURNING ticker_id")
+    ticker_ids = {row[0] for row in cursor.fetchall()}
+
+    # Expired buckets can no longer affect any window
+    cursor.execute(
+        f"DELETE FROM alert_window_buckets WHERE bucket_start < {UTC_NOW} - %s * INTERVAL '1 hour' RETURNING ticker_id",
+        (Config.ALERT_WINDOW_HOURS + 1,)
+    )
+    ticker_ids.update(row[0] for row in cursor.fetchall())
+    cursor.execute("SELECT DISTINCT ticker_id FROM alert_state WHERE active")
+    ticker_ids.update(row[0] for row in cursor.fetchall())
+    ticker_ids = sorted(ticker_ids)
+    if not ticker_ids:
+        conn.commit()
+        return 0
+
+    cursor.execute(
+        f"""
+        SELECT t.id, t.symbol,
+               COALESCE(SUM(b.total), 0), COALESCE(SUM(b.negative), 0), COALESCE(SUM(b.weighted_score), 0)
+        FROM tickers t
+        LEFT JOIN alert_window_buckets b
+          ON b.ticker_id = t.id
+         AND b.bucket_start >= date_trunc('hour', {UTC_NOW} - %s * INTERVAL '1 hour')
+        WHERE t.id = ANY(%s)
+        GROUP BY t.id, t.symbol
+        """,
+        (Config.ALERT_WINDOW_HOURS, ticker_ids)
+    )
+    windows = {
+        row[0]: {"symbol": row[1], "total": row[2], "negative": row[3], "weighted_score": row[4]}
+        for row in cursor.fetchall()
+    }
+
+    cursor.execute(
+        "SELECT ticker_id, rule, active, last_fired_at FROM alert_state WHERE ticker_id = ANY(%s)",
+        (ticker_ids,)
+    )
+    states = {(row[0], row[1]): (row[2], row[3]) for row in cursor.fetchall()}
+
+    now = datetime.utcnow()
+    cooldown = timedelta(hours=Config.ALERT_COOLDOWN_HOURS)
+    sent = 0
+    for ticker_id, window in windows.items():
+        fired = []
+        for rule in ALERT_RULES:
+            value, breached = rule.evaluate(window)
+            active, last_fired_at = states.get((ticker_id, rule.name), (False, None))
+            if breached and not active and (last_fired_at is None or now - last_fired_at >= cooldown):
+                fired.append((rule, value))
+                active, last_fired_at = True, now
+            elif not breached:
+                active = False
+            cursor.execute(
+                """
+                INSERT INTO alert_state (ticker_id, rule, active, last_value, last_fired_at, updated_at)
+                VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (ticker_id, rule) DO UPDATE SET
+                    active = EXCLUDED.active,
+                    last_value = EXCLUDED.last_value,
+                    last_fired_at = EXCLUDED.last_fired_at,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (ticker_id, rule.name, active, value, last_fired_at)
+            )
+
+        if fired:
+            symbol = window['symbol']
+            lines = [
+                f"- {rule.description}: {value:.2f} (threshold {rule.threshold})"
+                for rule, value in fired
+            ]
+            body = (
+                f"SentimentLens has detected unusual sentiment for {symbol} "
+                f"in the last {Config.ALERT_WINDOW_HOURS} hours "
+                f"({window['total']} articles, {window['negative']} negative):\n"
+                + "\n".join(lines)
+                + "\nYou may want to review this ticker."
+            )
+            # Queued in this transaction, so an alert is recorded exactly when its state is
+            alerter.send_alert(f"Sentiment Alert for {symbol}", body, cursor=cursor)
+            sent += 1
+
+    conn.commit()
+    return sent
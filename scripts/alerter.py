@@ -1,24 +1,36 @@
 
 
 import smtplib
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 # This needs a relative import to work correctly when run as a module
 from backend.config import Config
+from backend.database import get_db_connection
+
+
+def _email_configured(config):
+    # Login credentials are optional so a local SMTP stand-in can be used in tests
+    return all([config.SMTP_SERVER, config.SMTP_PORT, config.SMTP_FROM, config.ALERT_RECIPIENT_EMAIL])
+
 
 class Alerter:
 
     def __init__(self):
         self.config = Config()
         # Check if all necessary SMTP settings are present in the .env file
-        if not all([self.config.SMTP_SERVER, self.config.SMTP_PORT, self.config.SMTP_USER, self.config.SMTP_PASSWORD, self.config.ALERT_RECIPIENT_EMAIL]):
+        if not _email_configured(self.config):
             print("SMTP configuration is incomplete. Alerts will be printed to console instead of being emailed.")
             self.email_enabled = False
         else:
             self.email_enabled = True
 
-    def send_alert(self, subject: str, body: str):
+    def send_alert(self, subject: str, body: str, cursor=None):
+        """
+        Prints the alert and queues it in the alert outbox for the delivery
+        worker. Pass `cursor` to queue it inside the caller's transaction.
+        """
         print("\n--- ALERT TRIGGERED ---")
         print(f"Subject: {subject}")
         print(f"Body: {body}")
@@ -27,20 +39,179 @@ class Alerter:
         if not self.email_enabled:
             return
 
-        # Create the email message
+        query = "INSERT INTO alert_outbox (subject, body) VALUES (%s, %s)"
+        if cursor is not None:
+            cursor.execute(query, (subject, body))
+        else:
+            with get_db_connection() as conn:
+                conn.cursor().execute(query, (subject, body))
+                conn.commit()
+
+
+class AlertDeliveryWorker:
+    """
+    Background thread that delivers queued alerts from `alert_outbox`. Alerts
+    due at the same time are sent as one digest over a single reused,
+    authenticated SMTP session; failed sends are retried with exponential
+    backoff. For local testing, point SMTP_SERVER/SMTP_PORT at a stand-in such
+    as `python -m aiosmtpd -n -l localhost:1025` with SMTP_USE_TLS=false.
+    """
+
+    def __init__(self, poll_seconds=None):
+        self.config = Config()
+        self.poll_seconds = poll_seconds or self.config.ALERT_DELIVERY_POLL_SECONDS
+        self._smtp = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not _email_configured(self.config):
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="alert-delivery", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Delivers pending alerts now instead of at the next poll."""
+        self._wake.set()
+
+    def stop(self, timeout=30):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._close_session()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.deliver_pending():
+                    pass
+            except Exception as e:
+                print(f"Alert delivery loop error: {e}")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def deliver_pending(self, limit=100):
+        """Sends one digest of due alerts. Returns the number of alerts sent."""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT id, subject, body
+                FROM alert_outbox
+                WHERE status = 'pending' AND next_attempt_at <= CURRENT_TIMESTAMP
+                ORDER BY id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (limit,)
+            )
+            alerts = cursor.fetchall()
+            if not alerts:
+                conn.rollback()
+                return 0
+
+            # A message that can't even be rendered counts as a failed attempt on
+            # its own, so it can't poison the digest or be retried forever
+            deliverable = []
+            for alert in alerts:
+                try:
+                    self._digest([alert]).as_string()
+                except Exception as e:
+                    print(f"Could not build email alert {alert[0]}: {e}")
+                    self._record_failure(cursor, [alert[0]], e)
+                else:
+                    deliverable.append(alert)
+            if not deliverable:
+                conn.commit()
+                return 0
+
+            ids = [alert[0] for alert in deliverable]
+            try:
+                self._send(self._digest(deliverable))
+            except Exception as e:
+                print(f"Failed to send email alert digest ({len(deliverable)} alerts): {e}")
+                self._close_session()
+                self._record_failure(cursor, ids, e)
+                conn.commit()
+                return 0
+
+            cursor.execute(
+                "UPDATE alert_outbox SET status = 'sent', sent_at = CURRENT_TIMESTAMP, attempts = attempts + 1 "
+                "WHERE id = ANY(%s)",
+                (ids,)
+            )
+            conn.commit()
+            print(f"Successfully sent email alert digest ({len(deliverable)} alerts).")
+            return len(deliverable)
+
+    def _record_failure(self, cursor, ids, error):
+        """Counts a failed attempt, backing off exponentially and dead-lettering after the limit."""
+        cursor.execute(
+            """
+            UPDATE alert_outbox
+            SET attempts = attempts + 1,
+                status = CASE WHEN attempts + 1 >= %s THEN 'failed' ELSE 'pending' END,
+                next_attempt_at = CURRENT_TIMESTAMP
+                    + LEAST(%s * POWER(2, attempts), %s) * INTERVAL '1 second',
+                last_error = %s
+            WHERE id = ANY(%s)
+            """,
+            (
+                self.config.ALERT_MAX_ATTEMPTS,
+                self.config.ALERT_RETRY_BASE_SECONDS,
+                self.config.ALERT_RETRY_MAX_SECONDS,
+                str(error)[:1000],
+                list(ids),
+            )
+        )
+
+    def _digest(self, alerts):
+        """Builds one email for a batch of alerts."""
         msg = MIMEMultipart()
-        msg['From'] = self.config.SMTP_USER
+        msg['From'] = self.config.SMTP_FROM
         msg['To'] = self.config.ALERT_RECIPIENT_EMAIL
-        msg['Subject'] = subject
+        if len(alerts) == 1:
+            _, subject, body = alerts[0]
+            msg['Subject'] = subject
+        else:
+            msg['Subject'] = f"SentimentLens: {len(alerts)} sentiment alerts"
+            body = "\n\n".join(f"{subject}\n{'-' * len(subject)}\n{text}" for _, subject, text in alerts)
         msg.attach(MIMEText(body, 'plain'))
+        return msg
+
+    def _send(self, msg):
+        self._session().send_message(msg)
+
+    def _session(self):
+        """Returns the open SMTP session, reconnecting if the server dropped it."""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_session()
+
+        server = smtplib.SMTP(self.config.SMTP_SERVER, int(self.config.SMTP_PORT), timeout=30)
+        if self.config.SMTP_USE_TLS:
+            server.starttls()  # Secure the connection
+        if self.config.SMTP_USER and self.config.SMTP_PASSWORD:
+            server.login(self.config.SMTP_USER, self.config.SMTP_PASSWORD)
+        self._smtp = server
+        return server
+
+    def _close_session(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
 
-        try:
-            # Connect to the SMTP server and send the email
-            with smtplib.SMTP(self.config.SMTP_SERVER, int(self.config.SMTP_PORT)) as server:
-                server.starttls()  # Secure the connection
-                server.login(self.config.SMTP_USER, self.config.SMTP_PASSWORD)
-                server.send_message(msg)
-                print("Successfully sent email alert.")
-        except Exception as e:
-            print(f"Failed to send email alert: {e}")
 
+# Shared by the scheduler loop in this process
+delivery_worker = AlertDeliveryWorker()
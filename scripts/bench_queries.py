@@ -0,0 +1,86 @@
+# SentimentLens/scripts/bench_queries.py
+
+import argparse
+from datetime import datetime, timedelta
+
+from backend.database import get_db_connection
+
+# The hot queries issued by the API, the dashboards and the scheduler
+HOT_QUERIES = {
+    "api_sentiment_by_ticker": (
+        """
+        SELECT a.published_at, s.sentiment, s.confidence, a.title, a.url, t.symbol
+        FROM sentiment_data s
+        JOIN articles a ON s.article_id = a.id
+        JOIN tickers t ON a.ticker_id = t.id
+        WHERE t.symbol = %(symbol)s
+        ORDER BY a.published_at DESC
+        """
+    ),
+    "unscored_articles_anti_join": (
+        """
+        SELECT a.id, a.title, a.content
+        FROM articles a
+        LEFT JOIN sentiment_data s ON a.id = s.article_id
+        WHERE s.id IS NULL
+        """
+    ),
+    "negative_alert_window": (
+        """
+        SELECT t.symbol, COUNT(s.id) AS negative_count
+        FROM sentiment_data s
+        JOIN articles a ON s.article_id = a.id
+        JOIN tickers t ON a.ticker_id = t.id
+        WHERE s.sentiment = 'negative' AND a.published_at >= %(since)s
+        GROUP BY t.symbol
+        HAVING COUNT(s.id) >= 3
+        """
+    ),
+}
+
+
+def busiest_symbol(cursor):
+    cursor.execute(
+        """
+        SELECT t.symbol
+        FROM tickers t
+        JOIN articles a ON a.ticker_id = t.id
+        GROUP BY t.symbol
+        ORDER BY COUNT(*) DESC
+        LIMIT 1
+        """
+    )
+    row = cursor.fetchone()
+    return row[0] if row else 'AAPL'
+
+
+def explain_hot_queries(label):
+    """Runs EXPLAIN ANALYZE on each hot query and returns the report text."""
+    lines = [f"===== {label} ({datetime.now().isoformat(timespec='seconds')}) ====="]
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("ANALYZE")
+        params = {
+            "symbol": busiest_symbol(cursor),
+            "since": datetime.now() - timedelta(hours=24),
+        }
+        for name, query in HOT_QUERIES.items():
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+            lines.append(f"--- {name} ---")
+            lines.extend(row[0] for row in cursor.fetchall())
+        # EXPLAIN ANALYZE executes the queries; leave nothing behind
+        conn.rollback()
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record EXPLAIN ANALYZE plans for the hot queries.")
+    parser.add_argument("--label", default="run", help="e.g. 'before' or 'after' a migration.")
+    parser.add_argument("--output", default="bench_output.txt", help="File the report is appended to.")
+    args = parser.parse_args()
+
+    report = explain_hot_queries(args.label)
+    with open(args.output, "a") as f:
+        f.write(report)
+    print(report)
+    print(f"Appended query plans to {args.output}.")
@@ -0,0 +1,58 @@
+# SentimentLens/scripts/check_import_budget.py
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules a process serving stored data must never load
+FORBIDDEN_MODULES = ("torch", "transformers", "onnxruntime", "pandas")
+
+# Runs in a fresh interpreter so nothing already imported here skews the result
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def check_import_budget(module="backend.api", max_seconds=3.0, forbidden=FORBIDDEN_MODULES):
+    """
+    Imports `module` in a clean subprocess and returns a list of budget
+    violations: forbidden heavy modules it pulled in, or a slow import.
+    """
+    env = dict(os.environ, RUN_SCHEDULER_IN_API="false")
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        capture_output=True, text=True, env=env,
+    )
+    if result.returncode != 0:
+        return [f"importing {module} failed:\n{result.stderr.strip()}"]
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    loaded = set(report["modules"])
+    violations = [
+        f"{module} imports '{name}'" for name in forbidden
+        if name in loaded
+    ]
+    print(f"Imported {module} in {report['seconds']:.2f}s ({len(loaded)} modules loaded).")
+    if report["seconds"] > max_seconds:
+        violations.append(f"{module} took {report['seconds']:.2f}s to import (budget {max_seconds:.2f}s)")
+    return violations
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fail if a module's import pulls in the ML stack or is too slow.")
+    parser.add_argument("--module", default="backend.api")
+    parser.add_argument("--max-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    violations = check_import_budget(args.module, args.max_seconds)
+    for violation in violations:
+        print(f"FAIL: {violation}")
+    if violations:
+        sys.exit(1)
+    print("Import budget OK.")
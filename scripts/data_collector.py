@@ -1,61 +1,272 @@
 # SentimentLens/scripts/data_collector.py
 
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
 import requests
+from requests.adapters import HTTPAdapter
+from psycopg2.extras import execute_values
 from backend.config import Config
 from backend.database import get_db_connection
+from .work_queue import enqueue_articles
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def to_naive_utc(value):
+    """Converts a timezone-aware datetime to naive UTC; naive values are assumed to be UTC already."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_published_at(value):
+    """Parses a NewsAPI publishedAt string into a naive UTC datetime."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return to_naive_utc(parsed)
+
+
+def parse_cli_datetime(value):
+    """argparse type for --backfill-from/--backfill-to: ISO date or datetime, as naive UTC."""
+    return to_naive_utc(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+
+def incremental_since(watermark, default_since):
+    """
+    Start of a normal (non-backfill) fetch window: the watermark minus
+    NEWS_WATERMARK_OVERLAP_MINUTES, so articles NewsAPI indexes after a later
+    one was already seen are still picked up. Re-fetched articles are dropped
+    on insert.
+    """
+    if watermark is None:
+        return default_since
+    return watermark - timedelta(minutes=Config.NEWS_WATERMARK_OVERLAP_MINUTES)
+
+
+class TokenBucket:
+    """Thread-safe token bucket that blocks callers until a request slot is free."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 
 class NewsFetcher:
-    def __init__(self):
+    def __init__(self, concurrency=None, base_url=None):
         self.api_key = Config.NEWS_API_KEY
         if not self.api_key:
             raise ValueError("NEWS_API_KEY is not set.")
-        self.base_url = "https://newsapi.org/v2/everything"
+        self.base_url = base_url or Config.NEWS_API_BASE_URL
+        self.concurrency = concurrency or Config.NEWS_FETCH_CONCURRENCY
+        self.rate_limiter = TokenBucket(Config.NEWS_API_RATE_PER_SECOND, Config.NEWS_API_BURST)
+
+        # One keep-alive session shared by all fetch threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
-    def fetch_and_store_news(self):
+    def _get(self, params):
+        """GETs the NewsAPI endpoint, retrying 429/5xx with jittered exponential backoff."""
+        for attempt in range(Config.NEWS_API_MAX_RETRIES + 1):
+            self.rate_limiter.acquire()
+            response = self.session.get(self.base_url, params=params, timeout=Config.NEWS_API_TIMEOUT)
+            if response.status_code not in RETRY_STATUSES or attempt == Config.NEWS_API_MAX_RETRIES:
+                response.raise_for_status()
+                return response.json()
+
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+            else:
+                # "Full jitter" backoff keeps concurrent workers from retrying in lockstep
+                delay = random.uniform(0, min(30, 2 ** attempt))
+            print(f"NewsAPI returned {response.status_code} for {params.get('q')}; retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+    def fetch_ticker_news(self, symbol, since, until=None):
+        """
+        Fetches a ticker's articles published at or after `since` (and before
+        `until`, if given), paging newest-first until the window is covered.
+        Returns (articles, complete); `complete` is False when the page limit
+        was hit before reaching `since`, leaving older articles unfetched.
+        """
+        params = {
+            'q': symbol,
+            'apiKey': self.api_key,
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': Config.NEWS_API_PAGE_SIZE,
+            'from': since.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        if until is not None:
+            params['to'] = until.strftime('%Y-%m-%dT%H:%M:%S')
+
+        articles = []
+        for page in range(1, Config.NEWS_API_MAX_PAGES + 1):
+            payload = self._get(dict(params, page=page))
+            page_articles = payload.get('articles', [])
+            articles.extend(page_articles)
+
+            published = [parse_published_at(a.get('publishedAt')) for a in page_articles]
+            oldest = min((p for p in published if p is not None), default=None)
+            if ((oldest is not None and oldest <= since) or len(page_articles) < Config.NEWS_API_PAGE_SIZE
+                    or len(articles) >= payload.get('totalResults', 0)):
+                return articles, True
+
+        print(f"Warning: {symbol} has more than {len(articles)} articles since {since}; "
+              f"stopped after {Config.NEWS_API_MAX_PAGES} pages. Consider a backfill for this window.")
+        return articles, False
+
+    def store_articles(self, cursor, ticker_id, articles):
+        """
+        Inserts a ticker's articles with a single multi-row upsert, skipping URLs
+        that are already stored, and queues the new ones for scoring. Returns (inserted article ids, skipped count).
+        """
+        rows = {}
+        for article in articles:
+            if not article.get('url') or not article.get('title'):
+                continue
+            # Keep the first copy of a URL repeated within the same batch
+            rows.setdefault(article['url'], (
+                ticker_id,
+                article['title'],
+                article['url'],
+                (article.get('source') or {}).get('name'),
+                article.get('publishedAt'),
+                article.get('content') or article.get('description')
+            ))
+
+        if not rows:
+            return [], len(articles)
+
+        inserted = execute_values(
+            cursor,
+            """
+            INSERT INTO articles (ticker_id, title, url, source, published_at, content)
+            VALUES %s
+            ON CONFLICT (url) DO NOTHING
+            RETURNING id
+            """,
+            list(rows.values()),
+            page_size=len(rows),
+            fetch=True
+        )
+        inserted_ids = [row[0] for row in inserted]
+        enqueue_articles(cursor, inserted_ids)
+        return inserted_ids, len(articles) - len(inserted_ids)
+
+    def update_watermark(self, cursor, ticker_id, articles):
+        """Advances the ticker's watermark to the newest article seen (never backwards)."""
+        published = [parse_published_at(a.get('publishedAt')) for a in articles]
+        published = [p for p in published if p is not None]
+        if not published:
+            return
+        cursor.execute(
+            """
+            INSERT INTO ticker_watermarks (ticker_id, last_published_at)
+            VALUES (%s, %s)
+            ON CONFLICT (ticker_id) DO UPDATE SET
+                last_published_at = GREATEST(ticker_watermarks.last_published_at, EXCLUDED.last_published_at),
+                updated_at = CURRENT_TIMESTAMP
+            """,
+            (ticker_id, max(published))
+        )
+
+    def fetch_and_store_news(self, backfill_from=None, backfill_to=None, symbols=None, on_stored=None):
+        """
+        Fetches news for every tracked ticker (or just `symbols`) concurrently and
+        stores it as each ticker completes. Normal runs fetch only what is newer
+        than each ticker's watermark; passing `backfill_from`/`backfill_to` fetches
+        that date range instead and leaves the watermarks untouched.
+        `on_stored(symbol, inserted_ids)` is called after each ticker's commit.
+        Returns total inserted/skipped counts.
+        """
+        backfill_from, backfill_to = to_naive_utc(backfill_from), to_naive_utc(backfill_to)
+        backfill = backfill_from is not None
+        totals = {'inserted': 0, 'skipped': 0}
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, symbol FROM tickers")
-            tickers = cursor.fetchall()
-
-            for ticker in tickers:
-                print(f"Fetching news for {ticker['symbol']}...")
-                params = {
-                    'q': ticker['symbol'],
-                    'apiKey': self.api_key,
-                    'language': 'en',
-                    'sortBy': 'publishedAt',
-                    'pageSize': 20 # Fetch recent 20 articles
-                }
-                try:
-                    response = requests.get(self.base_url, params=params)
-                    response.raise_for_status()
-                    articles = response.json().get('articles', [])
-
-                    for article in articles:
-                        # Avoid duplicates
-                        cursor.execute("SELECT id FROM articles WHERE url = %s", (article['url'],))
-                        if cursor.fetchone():
-                            continue
-
-                        cursor.execute(
-                            """
-                            INSERT INTO articles (ticker_id, title, url, source, published_at, content)
-                            VALUES (%s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                ticker['id'],
-                                article['title'],
-                                article['url'],
-                                article.get('source', {}).get('name'),
-                                article['publishedAt'],
-                                article.get('content') or article.get('description')
-                            )
-                        )
+            cursor.execute(
+                """
+                SELECT t.id, t.symbol, w.last_published_at
+                FROM tickers t
+                LEFT JOIN ticker_watermarks w ON w.ticker_id = t.id
+                """
+            )
+            tickers = [row for row in cursor.fetchall() if not symbols or row[1] in symbols]
+            default_since = datetime.utcnow() - timedelta(hours=Config.NEWS_INITIAL_LOOKBACK_HOURS)
+
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {}
+                for ticker_id, symbol, watermark in tickers:
+                    if backfill:
+                        since, until = backfill_from, backfill_to
+                    else:
+                        since, until = incremental_since(watermark, default_since), None
+                    print(f"Fetching news for {symbol} since {since}...")
+                    futures[executor.submit(self.fetch_ticker_news, symbol, since, until)] = (ticker_id, symbol)
+
+                # Database writes stay on this thread and its single connection
+                for future in as_completed(futures):
+                    ticker_id, symbol = futures[future]
+                    try:
+                        articles, complete = future.result()
+                    except requests.exceptions.RequestException as e:
+                        print(f"Error fetching news for {symbol}: {e}")
+                        continue
+
+                    inserted_ids, skipped = self.store_articles(cursor, ticker_id, articles)
+                    if not backfill and complete:
+                        self.update_watermark(cursor, ticker_id, articles)
+                    elif not backfill:
+                        # Moving the watermark past the unfetched gap would skip it for good
+                        print(f"Keeping the watermark for {symbol}: the fetch was truncated.")
                     conn.commit()
-                    print(f"Stored {len(articles)} new articles for {ticker['symbol']}.")
-                except requests.exceptions.RequestException as e:
-                    print(f"Error fetching news for {ticker['symbol']}: {e}")
+                    totals['inserted'] += len(inserted_ids)
+                    totals['skipped'] += skipped
+                    print(f"Stored {len(inserted_ids)} new articles for {symbol} ({skipped} skipped).")
+                    if on_stored is not None and inserted_ids:
+                        on_stored(symbol, inserted_ids)
+        return totals
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fetch and store news for tracked tickers.")
+    parser.add_argument("--backfill-from", type=parse_cli_datetime,
+                        help="Start of a one-off backfill window (e.g. 2024-01-01).")
+    parser.add_argument("--backfill-to", type=parse_cli_datetime,
+                        help="End of the backfill window (defaults to now).")
+    parser.add_argument("--tickers", nargs="+", help="Only fetch these ticker symbols.")
+    args = parser.parse_args()
+
+    if args.backfill_to and not args.backfill_from:
+        parser.error("--backfill-to requires --backfill-from")
+
     fetcher = NewsFetcher()
-    fetcher.fetch_and_store_news()
+    symbols = [t.upper() for t in args.tickers] if args.tickers else None
+    fetcher.fetch_and_store_news(args.backfill_from, args.backfill_to, symbols)
@@ -0,0 +1,158 @@
+# SentimentLens/scripts/inference_workers.py
+
+import multiprocessing as mp
+import os
+import queue
+import signal
+import socket
+import time
+
+from backend.database import get_db_connection
+from .work_queue import PENDING, PROCESSING
+
+# Seconds an idle worker waits for new work before polling the queue again
+IDLE_POLL_SECONDS = 30
+# Longest pause between retries after process_new_articles fails (e.g. the database is down)
+MAX_ERROR_BACKOFF_SECONDS = 300
+
+
+def _worker_main(index, threads, stop_event, wake_event, stats_queue):
+    """Entry point of one inference process: load the model once, then drain the queue."""
+    # The parent coordinates shutdown; finish the current batch instead of dying mid-write
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    # Imported here so the heavy model stack only loads inside worker processes
+    from ml.registry import registry
+    from .scheduled_tasks import process_new_articles
+
+    registry.warm_up()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:w{index}"
+    print(f"Inference worker {index} ready ({threads} torch threads).")
+
+    backoff = 0
+    while not stop_event.is_set():
+        wake_event.clear()
+        start = time.perf_counter()
+        try:
+            processed = process_new_articles(worker_id=worker_id, stop_event=stop_event)
+        except Exception as e:
+            # Keep the process (and its loaded model) alive through transient failures
+            backoff = min(max(backoff * 2, 5), MAX_ERROR_BACKOFF_SECONDS)
+            print(f"Inference worker {index} failed: {e}; retrying in {backoff}s.")
+            stop_event.wait(backoff)
+            continue
+        backoff = 0
+        if processed:
+            stats_queue.put({
+                "worker": index,
+                "processed": processed,
+                "seconds": time.perf_counter() - start,
+            })
+        else:
+            wake_event.wait(IDLE_POLL_SECONDS)
+
+    print(f"Inference worker {index} stopped.")
+
+
+class InferenceWorkerPool:
+    """
+    Runs N long-lived inference processes that each load the model once and
+    drain article_queue in parallel, with torch threads split between them.
+    """
+
+    def __init__(self, workers, threads_per_worker=None):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        # spawn gives each worker a clean interpreter: no inherited torch threads or DB sockets
+        self._ctx = mp.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._wake_event = self._ctx.Event()
+        self._stats_queue = self._ctx.Queue()
+        self._processes = []
+        self.totals = {}
+
+    def start(self):
+        self._processes = [self._spawn(index) for index in range(self.workers)]
+        print(f"Started {self.workers} inference workers with {self.threads_per_worker} torch threads each.")
+
+    def _spawn(self, index):
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self.threads_per_worker, self._stop_event, self._wake_event, self._stats_queue),
+            name=f"inference-worker-{index}",
+        )
+        process.start()
+        return process
+
+    def restart_dead(self):
+        """Replaces workers that have exited (crashed or killed). Returns how many were restarted."""
+        if self._stop_event.is_set():
+            return 0
+        restarted = 0
+        for index, process in enumerate(self._processes):
+            if not process.is_alive():
+                print(f"{process.name} exited with code {process.exitcode}; restarting.")
+                process.join()
+                self._processes[index] = self._spawn(index)
+                restarted += 1
+        return restarted
+
+    def wake(self):
+        """Tells idle workers that new articles were queued, restarting any that died."""
+        self.restart_dead()
+        self._wake_event.set()
+
+    def pending_count(self):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT COUNT(*) FROM article_queue WHERE status IN (%s, %s)",
+                (PENDING, PROCESSING)
+            )
+            return cursor.fetchone()[0]
+
+    def wait_until_drained(self, timeout=None, poll_seconds=2):
+        """Blocks until the queue is empty (or the timeout passes). Returns True if drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending_count():
+            self.restart_dead()
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_seconds)
+        return True
+
+    def report_stats(self):
+        """Collects throughput reported by the workers since the last call and prints it."""
+        cycle = {}
+        while True:
+            try:
+                stat = self._stats_queue.get_nowait()
+            except queue.Empty:
+                break
+            for totals in (cycle, self.totals):
+                entry = totals.setdefault(stat["worker"], {"processed": 0, "seconds": 0.0})
+                entry["processed"] += stat["processed"]
+                entry["seconds"] += stat["seconds"]
+
+        for worker, entry in sorted(cycle.items()):
+            rate = entry["processed"] / entry["seconds"] if entry["seconds"] else 0.0
+            print(f"Worker {worker}: {entry['processed']} articles in {entry['seconds']:.1f}s ({rate:.1f}/s).")
+        return cycle
+
+    def stop(self, timeout=60):
+        """Asks workers to finish their current batch and exit, terminating stragglers."""
+        self._stop_event.set()
+        self._wake_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                print(f"{process.name} did not stop in time; terminating.")
+                process.terminate()
+                process.join()
+        self.report_stats()
+        self._processes = []
@@ -0,0 +1,152 @@
+# SentimentLens/scripts/pipeline.py
+
+import os
+import queue
+import socket
+import threading
+import time
+
+from backend.config import Config
+from backend.database import get_db_connection
+from .work_queue import claim_articles
+
+# Marks the end of a stage's input
+_DONE = object()
+
+
+class EtlPipeline:
+    """
+    Streams one ETL cycle through three concurrent stages joined by bounded
+    queues: fetch (NEWS_FETCH_CONCURRENCY HTTP threads, stored per ticker as it
+    completes) -> batching inference (PIPELINE_INFERENCE_THREADS) -> alert
+    evaluation. A full queue blocks the stage before it, so a slow model holds
+    back storage instead of buffering without bound, and alerts fire seconds
+    after an article is scored rather than at the end of the cycle.
+
+    Articles are also in article_queue, so anything still in flight if the
+    process dies is picked up by the next cycle.
+    """
+
+    def __init__(self, queue_size=None, inference_threads=None, batch_size=None,
+                 batch_wait_seconds=None, alert_interval_seconds=None):
+        self.inference_threads = inference_threads or Config.PIPELINE_INFERENCE_THREADS
+        self.batch_size = batch_size or Config.PIPELINE_BATCH_SIZE
+        self.batch_wait_seconds = batch_wait_seconds or Config.PIPELINE_BATCH_WAIT_SECONDS
+        self.alert_interval_seconds = alert_interval_seconds or Config.PIPELINE_ALERT_INTERVAL_SECONDS
+        self.articles = queue.Queue(maxsize=queue_size or Config.PIPELINE_QUEUE_SIZE)
+        self.scored = queue.Queue(maxsize=queue_size or Config.PIPELINE_QUEUE_SIZE)
+        self._stats_lock = threading.Lock()
+        self.stats = {"fetched": 0, "scored": 0, "batches": 0, "alert_checks": 0, "alerts": 0}
+
+    def run(self, fetcher):
+        """Runs one cycle through the pipeline and returns its stats."""
+        # Imported here: scheduled_tasks imports this module
+        from ml.registry import registry
+        from ml.preprocess import RuleBasedFilter
+
+        predictor = registry.reload_if_changed()
+        rb_filter = RuleBasedFilter()
+        start = time.perf_counter()
+
+        inference = [
+            threading.Thread(target=self._inference_stage, args=(index, predictor, rb_filter),
+                             name=f"pipeline-inference-{index}", daemon=True)
+            for index in range(self.inference_threads)
+        ]
+        alerting = threading.Thread(target=self._alert_stage, name="pipeline-alerts", daemon=True)
+        for thread in inference:
+            thread.start()
+        alerting.start()
+
+        try:
+            fetcher.fetch_and_store_news(on_stored=self._on_stored)
+        finally:
+            # Let each inference thread finish its batch, then the alert stage
+            for _ in inference:
+                self.articles.put(_DONE)
+            for thread in inference:
+                thread.join()
+            self.scored.put(_DONE)
+            alerting.join()
+
+        self.stats["seconds"] = time.perf_counter() - start
+        print(f"Pipeline: {self.stats['fetched']} articles stored, {self.stats['scored']} scored in "
+              f"{self.stats['batches']} batches, {self.stats['alerts']} alerts from "
+              f"{self.stats['alert_checks']} checks ({self.stats['seconds']:.1f}s).")
+        return self.stats
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _on_stored(self, symbol, article_ids):
+        # Blocks while the inference stage is behind (backpressure)
+        for article_id in article_ids:
+            self.articles.put(article_id)
+        self._count("fetched", len(article_ids))
+
+    def _next_batch(self):
+        """Collects up to batch_size ids, waiting at most batch_wait_seconds after the first."""
+        first = self.articles.get()
+        if first is _DONE:
+            return None, True
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                article_id = self.articles.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if article_id is _DONE:
+                return batch, True
+            batch.append(article_id)
+        return batch, False
+
+    def _inference_stage(self, index, predictor, rb_filter):
+        from .scheduled_tasks import score_claimed_articles
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:p{index}"
+        finished = False
+        while not finished:
+            batch, finished = self._next_batch()
+            if not batch:
+                continue
+            try:
+                with get_db_connection() as conn:
+                    articles = claim_articles(conn, worker_id, limit=len(batch), article_ids=batch)
+                if not articles:
+                    continue
+                scored = score_claimed_articles(articles, predictor, rb_filter)
+            except Exception as e:
+                # The claimed articles were released back to article_queue
+                print(f"Pipeline inference batch failed: {e}")
+                continue
+            self._count("scored", scored)
+            self._count("batches")
+            if scored:
+                self.scored.put(scored)
+
+    def _alert_stage(self):
+        from .scheduled_tasks import check_for_alerts
+
+        finished = False
+        while not finished:
+            # Coalesce everything scored since the last check into one evaluation
+            pending = self.scored.get()
+            finished = pending is _DONE
+            while not finished:
+                try:
+                    pending = self.scored.get_nowait()
+                except queue.Empty:
+                    break
+                finished = pending is _DONE
+            try:
+                self._count("alerts", check_for_alerts())
+                self._count("alert_checks")
+            except Exception as e:
+                print(f"Pipeline alert check failed: {e}")
+            if not finished:
+                time.sleep(self.alert_interval_seconds)
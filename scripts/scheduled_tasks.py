@@ -1,121 +1,278 @@
 
+import argparse
+import os
+import signal
+import socket
 import time
 import schedule
-import pandas as pd
-from datetime import datetime, timedelta
 
 from .data_collector import NewsFetcher
-from .alerter import Alerter
+from .alerter import Alerter, delivery_worker
+from .alert_engine import evaluate_alerts, record_alert_events
+from .inference_workers import InferenceWorkerPool
+from .pipeline import EtlPipeline
+from .work_queue import (
+    DONE, SKIPPED, claim_articles, complete_articles, fail_exhausted, release_articles
+)
 
 # These are top-level imports and are correct
-from ml.predict import SentimentPredictor
+from ml.registry import registry
+from ml.cache import prediction_cache
 from ml.preprocess import RuleBasedFilter
-from backend.database import get_db_connection
+from backend.config import Config
+from backend.leader import LeaderElector
+from backend.database import bump_data_version, get_db_connection
+from backend.rollup import update_daily_rollup
+from psycopg2.extras import execute_values
 
+# Number of texts per forward pass when scoring new articles
+PREDICT_BATCH_SIZE = 32
+# A drain gives up after this many failed batches in a row (e.g. the model is broken),
+# instead of burning every queued article's attempts
+MAX_CONSECUTIVE_BATCH_FAILURES = 3
 
-def process_new_articles():
+
+def store_sentiment(cursor, model_id, scored):
+    """
+    Stores (article_id, prediction) pairs; an article is only scored once per
+    model. Returns the ids of the sentiment rows actually inserted.
+    """
+    rows = [
+        (article_id, model_id, prediction['sentiment'], prediction['confidence'])
+        for article_id, prediction in scored
+    ]
+    if not rows:
+        return []
+    inserted = execute_values(
+        cursor,
+        """
+        INSERT INTO sentiment_data (article_id, model_id, sentiment, confidence)
+        VALUES %s
+        ON CONFLICT (article_id, model_id) DO NOTHING
+        RETURNING id
+        """,
+        rows,
+        page_size=len(rows),
+        fetch=True
+    )
+    sentiment_ids = [row[0] for row in inserted]
+    if sentiment_ids:
+        update_daily_rollup(cursor, sentiment_ids)
+        record_alert_events(cursor, sentiment_ids)
+        # Lets API caches know their responses are stale once this commits
+        bump_data_version(cursor)
+    return sentiment_ids
+
+
+def score_claimed_articles(articles, predictor, rb_filter):
+    """Scores one claimed batch and settles it in the queue. Returns the number scored."""
+    # Rule-based filtering, one compiled pass per ticker (rules can differ per ticker)
+    by_symbol = {}
+    for article in articles:
+        by_symbol.setdefault(article[2], []).append(article)
+    noisy = set()
+    for symbol, group in by_symbol.items():
+        flags = rb_filter.is_noisy_batch([title for _, _, _, title, _ in group], ticker=symbol)
+        noisy.update(article[0] for article, flag in zip(group, flags) if flag)
+
+    noisy_ids = []
+    ids_to_score = []
+    texts_to_score = []
+    for article_id, _, _, title, content in articles:
+        if article_id in noisy:
+            print(f"Skipping noisy headline: {title}")
+            noisy_ids.append(article_id)
+            continue
+        ids_to_score.append(article_id)
+        texts_to_score.append(content or title)
+
+    try:
+        # Predict sentiment in length-bucketed batches
+        predictions = prediction_cache.predict_batch(predictor, texts_to_score, batch_size=PREDICT_BATCH_SIZE)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            store_sentiment(cursor, predictor.model_id, zip(ids_to_score, predictions))
+            complete_articles(cursor, ids_to_score, DONE)
+            complete_articles(cursor, noisy_ids, SKIPPED)
+            conn.commit()
+    except Exception as e:
+        # Hand the batch back now rather than waiting for its lease to expire
+        with get_db_connection() as conn:
+            release_articles(conn.cursor(), ids_to_score + noisy_ids, str(e))
+            conn.commit()
+        raise
+    return len(ids_to_score)
+
+
+def process_new_articles(worker_id=None, stop_event=None):
+    """
+    Drains the article queue: claims batches, scores them and stores the
+    results. Several processes can run this at once without double-scoring.
+    Returns the number of articles scored.
+    """
     print("Running job: Processing new articles for sentiment...")
-    predictor = SentimentPredictor()
+    # Reuse the process-wide model, picking up a newly trained one if present
+    predictor = registry.reload_if_changed()
     rb_filter = RuleBasedFilter()
-    
-    query = """
-        SELECT a.id, a.title, a.content
-        FROM articles a
-        LEFT JOIN sentiment_data s ON a.id = s.article_id
-        WHERE s.id IS NULL
-    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
     with get_db_connection() as conn:
-        articles_to_process = pd.read_sql_query(query, conn)
-        
-        if articles_to_process.empty:
-            print("No new articles to process.")
-            return
-
-        print(f"Found {len(articles_to_process)} new articles to process.")
-        
-        for _, article in articles_to_process.iterrows():
-            # Rule-based filtering
-            if rb_filter.is_noisy(article['title']):
-                print(f"Skipping noisy headline: {article['title']}")
-                continue
-
-            # Predict sentiment
-            text_to_analyze = article['content'] or article['title']
-            prediction = predictor.predict(text_to_analyze)
-
-            # Store sentiment
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO sentiment_data (article_id, sentiment, confidence)
-                VALUES (?, ?, ?)
-                """,
-                (article['id'], prediction['sentiment'], prediction['confidence'])
-            )
+        exhausted = fail_exhausted(conn.cursor())
         conn.commit()
+    if exhausted:
+        print(f"Marked {exhausted} articles as failed after repeated attempts.")
+
+    processed = 0
+    failures = 0
+    while not (stop_event and stop_event.is_set()):
+        with get_db_connection() as conn:
+            articles = claim_articles(conn, worker_id)
+        if not articles:
+            break
+        print(f"Claimed {len(articles)} articles to process.")
+        try:
+            processed += score_claimed_articles(articles, predictor, rb_filter)
+        except Exception as e:
+            # The batch was released for retry; carry on with the next claim
+            failures += 1
+            print(f"Failed to process a batch of {len(articles)} articles: {e}")
+            if failures >= MAX_CONSECUTIVE_BATCH_FAILURES:
+                print(f"{failures} batches failed in a row; stopping this drain.")
+                break
+            continue
+        failures = 0
+
+    if not processed:
+        print("No new articles to process.")
     print("Article processing job complete.")
+    return processed
 
 
 def check_for_alerts():
     print("Running job: Checking for alert conditions...")
     alerter = Alerter()
-    
-    # Alert if a ticker has > 3 negative articles in the last 24 hours
-    alert_threshold = 3
-    time_window = datetime.now() - timedelta(hours=24)
-    
-    query = """
-        SELECT
-            t.symbol,
-            COUNT(s.id) as negative_count
-        FROM sentiment_data s
-        JOIN articles a ON s.article_id = a.id
-        JOIN tickers t ON a.ticker_id = t.id
-        WHERE
-            s.sentiment = 'negative' AND
-            a.published_at >= ?
-        GROUP BY t.symbol
-        HAVING COUNT(s.id) >= ?
-    """
-    
+
+    # Only tickers with new sentiment since the last check are evaluated
     with get_db_connection() as conn:
-        alerts_needed = pd.read_sql_query(query, conn, params=(time_window.isoformat(), alert_threshold))
-        
-        for _, row in alerts_needed.iterrows():
-            subject = f"Sentiment Alert for {row['symbol']}"
-            body = (
-                f"SentimentLens has detected {row['negative_count']} negative articles "
-                f"for {row['symbol']} in the last 24 hours. "
-                "You may want to review this ticker."
-            )
-            alerter.send_alert(subject, body)
-            
-    print("Alert check complete.")
-
-
-def run_all_tasks():
+        sent = evaluate_alerts(conn, alerter)
+
+    # Email goes out on the delivery worker's thread, not inside the cycle
+    if sent:
+        delivery_worker.wake()
+    print(f"Alert check complete ({sent} alerts sent).")
+    return sent
+
+
+def run_all_tasks(worker_pool=None):
     print("\n--- Running Full ETL and Alerting Cycle ---")
-    # 1. Fetch new data
     fetcher = NewsFetcher()
+    if Config.ETL_MODE == "pipeline" and worker_pool is None:
+        # Fetch, score and alert concurrently as articles arrive
+        EtlPipeline().run(fetcher)
+        # Pick up articles left in the queue by earlier cycles or failed batches
+        if process_new_articles():
+            check_for_alerts()
+        _report_memory()
+        print("--- Cycle Complete ---")
+        return
+    if Config.ETL_MODE == "pipeline":
+        print("ETL_MODE=pipeline scores in-process; running the batch cycle on the inference workers instead.")
+
+    # 1. Fetch new data
     fetcher.fetch_and_store_news()
     
-    # 2. Process fetched data
-    process_new_articles()
+    # 2. Process fetched data, in-process or on the inference workers
+    if worker_pool is None:
+        process_new_articles()
+    else:
+        worker_pool.wake()
+        if not worker_pool.wait_until_drained(timeout=Config.INFERENCE_DRAIN_TIMEOUT):
+            print("Inference workers did not drain the queue in time; alerting on what is scored.")
+        worker_pool.report_stats()
     
     # 3. Check for alerts
     check_for_alerts()
+
+    if worker_pool is None:
+        _report_memory()
     print("--- Cycle Complete ---")
 
 
-def main():
-    schedule.every().hour.do(run_all_tasks)
+def _report_memory():
+    memory = registry.memory_report()
+    print(f"Model memory: {memory['total_model_bytes'] / (1024 * 1024):.1f} MB of weights, "
+          f"peak RSS {memory['peak_rss_bytes'] / (1024 * 1024):.1f} MB.")
+    cache = prediction_cache.stats()
+    print(f"Prediction cache: {cache['hits']} hits, {cache['persistent_hits']} persistent hits, "
+          f"{cache['misses']} misses ({cache['hit_rate']:.0%} hit rate).")
+
 
-    print("Scheduler started. First run will be in an hour.")
+def _run_cycle(worker_pool=None):
+    """Runs one cycle, logging failures so a bad cycle doesn't kill the scheduler."""
+    try:
+        run_all_tasks(worker_pool)
+    except Exception as e:
+        print(f"Scheduled cycle failed: {e}")
+
+
+def run_scheduler(elector, worker_pool=None):
+    """
+    Runs the hourly cycle only while this process is the elected leader, so
+    exactly one scheduler is active across API workers and hosts. Followers
+    wait and take over if the leader dies.
+    """
     while True:
-        schedule.run_pending()
-        time.sleep(1)
+        elector.wait_for_leadership()
+        job = schedule.every().hour.do(_run_cycle, worker_pool=worker_pool)
+        try:
+            if worker_pool is None:
+                # Load the model before the first cycle so it isn't paid inside a run
+                registry.warm_up()
+            delivery_worker.start()
+
+            # Run the tasks once immediately on taking over
+            _run_cycle(worker_pool)
+            print("Scheduler started. Next run will be in an hour.")
+            while elector.is_leader():
+                schedule.run_pending()
+                time.sleep(1)
+        except Exception as e:
+            print(f"Scheduler leader failed: {e}")
+        finally:
+            schedule.cancel_job(job)
+            delivery_worker.stop()
+            # Drop the lock so a follower can take over if this process is unhealthy
+            elector.release()
+        print("Scheduler stepped down; waiting to be elected again.")
+        time.sleep(Config.SCHEDULER_ELECTION_POLL_SECONDS)
+
+
+def _stop_on_signal(signum, frame):
+    raise SystemExit(0)
+
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the SentimentLens ETL and alerting scheduler.")
+    parser.add_argument("--workers", type=int, default=Config.INFERENCE_WORKERS,
+                        help="Number of inference processes (1 scores in the scheduler process).")
+    parser.add_argument("--threads-per-worker", type=int, default=None,
+                        help="Torch threads per worker (defaults to CPU count / workers).")
+    args = parser.parse_args()
+
     print("--- Confirming execution of the correct 'scheduled_tasks.py' file. ---")
-    run_all_tasks()
-    main()
+    worker_pool = None
+    if args.workers > 1:
+        worker_pool = InferenceWorkerPool(args.workers, args.threads_per_worker)
+        worker_pool.start()
+        signal.signal(signal.SIGTERM, _stop_on_signal)
+
+    elector = LeaderElector()
+    try:
+        run_scheduler(elector, worker_pool)
+    except KeyboardInterrupt:
+        print("Scheduler interrupted.")
+    finally:
+        elector.release()
+        if worker_pool is not None:
+            print("Stopping inference workers...")
+            worker_pool.stop()
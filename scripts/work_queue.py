@@ -0,0 +1,126 @@
+# SentimentLens/scripts/work_queue.py
+
+from backend.config import Config
+
+# Queue states: pending -> processing -> done | skipped, or back to pending on
+# failure until the attempts run out, then failed.
+PENDING, PROCESSING, DONE, SKIPPED, FAILED = "pending", "processing", "done", "skipped", "failed"
+
+
+def enqueue_articles(cursor, article_ids):
+    """Queues newly stored articles for sentiment scoring."""
+    if not article_ids:
+        return
+    cursor.execute(
+        """
+        INSERT INTO article_queue (article_id)
+        SELECT unnest(%s::integer[])
+        ON CONFLICT (article_id) DO NOTHING
+        """,
+        (list(article_ids),)
+    )
+
+
+def claim_articles(conn, worker_id, limit=None, lease_seconds=None, article_ids=None):
+    """
+    Claims up to `limit` pending articles (or ones whose lease expired after a
+    worker crash) for this worker and commits the claim. Concurrent workers
+    skip each other's locked rows, so no article is handed out twice. Passing
+    `article_ids` restricts the claim to those articles.
+    Returns a list of (article_id, ticker_id, symbol, title, content).
+    """
+    only_ids = "AND article_id = ANY(%(article_ids)s)" if article_ids is not None else ""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        WITH claimable AS (
+            SELECT article_id
+            FROM article_queue
+            WHERE (status = %(pending)s
+                   OR (status = %(processing)s AND lease_expires_at < CURRENT_TIMESTAMP))
+              AND attempts < %(max_attempts)s
+              {only_ids}
+            ORDER BY enqueued_at
+            LIMIT %(limit)s
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE article_queue q
+        SET status = %(processing)s,
+            attempts = q.attempts + 1,
+            worker_id = %(worker_id)s,
+            lease_expires_at = CURRENT_TIMESTAMP + %(lease_seconds)s * INTERVAL '1 second',
+            updated_at = CURRENT_TIMESTAMP
+        FROM claimable c
+        WHERE q.article_id = c.article_id
+        RETURNING q.article_id
+        """,
+        {
+            "pending": PENDING,
+            "processing": PROCESSING,
+            "max_attempts": Config.QUEUE_MAX_ATTEMPTS,
+            "limit": limit or Config.QUEUE_CLAIM_SIZE,
+            "worker_id": worker_id,
+            "lease_seconds": lease_seconds or Config.QUEUE_LEASE_SECONDS,
+            "article_ids": list(article_ids or []),
+        }
+    )
+    article_ids = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+    if not article_ids:
+        return []
+
+    cursor.execute(
+        """
+        SELECT a.id, a.ticker_id, t.symbol, a.title, a.content
+        FROM articles a
+        JOIN tickers t ON t.id = a.ticker_id
+        WHERE a.id = ANY(%s)
+        ORDER BY a.id
+        """,
+        (article_ids,)
+    )
+    return cursor.fetchall()
+
+
+def complete_articles(cursor, article_ids, status=DONE):
+    """Marks claimed articles as finished (done or skipped)."""
+    if not article_ids:
+        return
+    cursor.execute(
+        """
+        UPDATE article_queue
+        SET status = %s, lease_expires_at = NULL, last_error = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE article_id = ANY(%s)
+        """,
+        (status, list(article_ids))
+    )
+
+
+def release_articles(cursor, article_ids, error):
+    """Returns claimed articles to the queue after a failure, or fails them for good."""
+    if not article_ids:
+        return
+    cursor.execute(
+        """
+        UPDATE article_queue
+        SET status = CASE WHEN attempts >= %s THEN %s ELSE %s END,
+            lease_expires_at = NULL,
+            last_error = %s,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE article_id = ANY(%s)
+        """,
+        (Config.QUEUE_MAX_ATTEMPTS, FAILED, PENDING, error[:1000], list(article_ids))
+    )
+
+
+def fail_exhausted(cursor):
+    """Fails articles whose leases expired after their last allowed attempt."""
+    cursor.execute(
+        """
+        UPDATE article_queue
+        SET status = %s, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+        WHERE status = %s AND lease_expires_at < CURRENT_TIMESTAMP AND attempts >= %s
+        """,
+        (FAILED, PROCESSING, Config.QUEUE_MAX_ATTEMPTS)
+    )
+    return cursor.rowcount
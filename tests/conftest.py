@@ -0,0 +1,7 @@
+# SentimentLens/tests/conftest.py
+
+import os
+import sys
+
+# Tests import the app packages (backend, scripts, ml) from the repository root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
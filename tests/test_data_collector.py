@@ -0,0 +1,159 @@
+# SentimentLens/tests/test_data_collector.py
+
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from backend.config import Config
+from scripts.data_collector import NewsFetcher, incremental_since, parse_cli_datetime
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+class FakeNewsAPI(HTTPServer):
+    """Serves NewsAPI-shaped pages, newest first, from an in-memory article list."""
+
+    def __init__(self, articles, fail_first=0):
+        super().__init__(("127.0.0.1", 0), FakeNewsHandler)
+        self.articles = articles
+        self.fail_first = fail_first
+        self.requests = []
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/v2/everything"
+
+
+class FakeNewsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        server.requests.append(params)
+        if server.fail_first:
+            server.fail_first -= 1
+            self._reply(429, {"status": "error"}, {"Retry-After": "0"})
+            return
+
+        since = params["from"]
+        matching = [a for a in server.articles if a["publishedAt"] >= since]
+        page, size = int(params["page"]), int(params["pageSize"])
+        body = {
+            "status": "ok",
+            "totalResults": len(matching),
+            "articles": matching[(page - 1) * size:page * size],
+        }
+        self._reply(200, body)
+
+    def _reply(self, status, body, headers=None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_articles(count):
+    return [
+        {
+            "title": f"Headline {i}",
+            "url": f"https://news.example/{i}",
+            "source": {"name": "Example"},
+            "publishedAt": (NOW - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content": f"Body {i}",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def news_config(monkeypatch):
+    monkeypatch.setattr(Config, "NEWS_API_KEY", "test-key")
+    monkeypatch.setattr(Config, "NEWS_API_PAGE_SIZE", 5)
+    monkeypatch.setattr(Config, "NEWS_API_MAX_PAGES", 10)
+    monkeypatch.setattr(Config, "NEWS_API_MAX_RETRIES", 2)
+    monkeypatch.setattr(Config, "NEWS_API_RATE_PER_SECOND", 1000.0)
+
+
+@pytest.fixture
+def fake_api():
+    servers = []
+
+    def start(articles, fail_first=0):
+        server = FakeNewsAPI(articles, fail_first)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pages_until_the_window_is_covered(fake_api):
+    server = fake_api(make_articles(12))
+    fetcher = NewsFetcher(base_url=server.url)
+
+    articles, complete = fetcher.fetch_ticker_news("AAPL", NOW - timedelta(hours=30))
+
+    assert complete
+    assert [a["url"] for a in articles] == [f"https://news.example/{i}" for i in range(12)]
+    assert [r["page"] for r in server.requests] == ["1", "2", "3"]
+    assert server.requests[0]["q"] == "AAPL"
+
+
+def test_stops_paging_once_since_is_reached(fake_api):
+    server = fake_api(make_articles(12))
+    fetcher = NewsFetcher(base_url=server.url)
+
+    articles, complete = fetcher.fetch_ticker_news("AAPL", NOW - timedelta(hours=7))
+
+    assert complete
+    assert len(articles) == 8
+    assert len(server.requests) == 2
+
+
+def test_retries_rate_limited_requests(fake_api):
+    server = fake_api(make_articles(3), fail_first=2)
+    fetcher = NewsFetcher(base_url=server.url)
+
+    articles, complete = fetcher.fetch_ticker_news("AAPL", NOW - timedelta(hours=30))
+
+    assert complete
+    assert len(articles) == 3
+    assert len(server.requests) == 3
+
+
+def test_reports_a_truncated_fetch(fake_api, monkeypatch):
+    monkeypatch.setattr(Config, "NEWS_API_MAX_PAGES", 2)
+    server = fake_api(make_articles(12))
+    fetcher = NewsFetcher(base_url=server.url)
+
+    articles, complete = fetcher.fetch_ticker_news("AAPL", NOW - timedelta(hours=30))
+
+    assert not complete
+    assert len(articles) == 10
+
+
+def test_backfill_dates_are_normalized_to_naive_utc():
+    assert parse_cli_datetime("2024-01-01") == datetime(2024, 1, 1)
+    assert parse_cli_datetime("2024-01-01T05:00:00+05:00") == datetime(2024, 1, 1)
+    assert parse_cli_datetime("2024-01-01T00:00:00Z") == datetime(2024, 1, 1)
+
+
+def test_incremental_fetch_overlaps_the_watermark(monkeypatch):
+    monkeypatch.setattr(Config, "NEWS_WATERMARK_OVERLAP_MINUTES", 60)
+    default_since = NOW - timedelta(hours=24)
+
+    assert incremental_since(NOW, default_since) == NOW - timedelta(hours=1)
+    assert incremental_since(None, default_since) == default_since
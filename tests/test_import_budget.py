@@ -0,0 +1,7 @@
+# SentimentLens/tests/test_import_budget.py
+
+from scripts.check_import_budget import check_import_budget
+
+
+def test_api_import_stays_free_of_the_ml_stack():
+    assert check_import_budget("backend.api") == []
@@ -0,0 +1,129 @@
+# SentimentLens/tests/test_price_store.py
+
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from backend.price_store import CsvFixtureProvider, PriceStore
+
+
+class RecordingProvider:
+    """Wraps a provider and records every range it is asked for."""
+
+    def __init__(self, provider, empty=False):
+        self.provider = provider
+        self.empty = empty
+        self.calls = []
+
+    def history(self, symbol, start, end):
+        self.calls.append((start, end))
+        if self.empty:
+            return pd.DataFrame()
+        return self.provider.history(symbol, start, end)
+
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    days = pd.bdate_range(date.today() - timedelta(days=90), date.today() - timedelta(days=1))
+    prices = pd.DataFrame({
+        "Date": days,
+        "Open": range(len(days)),
+        "High": range(len(days)),
+        "Low": range(len(days)),
+        "Close": [100.0 + i for i in range(len(days))],
+        "Volume": [1000] * len(days),
+    })
+    directory = tmp_path / "fixtures"
+    directory.mkdir()
+    prices.to_csv(directory / "AAPL.csv", index=False)
+    return directory
+
+
+@pytest.fixture
+def provider(fixture_dir):
+    return RecordingProvider(CsvFixtureProvider(str(fixture_dir)))
+
+
+@pytest.fixture
+def store(tmp_path, provider):
+    return PriceStore(directory=str(tmp_path / "store"), provider=provider)
+
+
+def days_ago(n):
+    return date.today() - timedelta(days=n)
+
+
+def expected_days(start, end):
+    return list(pd.bdate_range(start, end))
+
+
+def test_cold_fetch_downloads_the_window(store, provider):
+    history = store.get_history("aapl", days_ago(20), days_ago(10))
+
+    assert provider.calls == [(days_ago(20), days_ago(10))]
+    assert list(history.index) == expected_days(days_ago(20), days_ago(10))
+    assert list(history.columns) == ["Open", "High", "Low", "Close", "Volume"]
+
+
+def test_overlapping_window_is_served_from_disk(store, provider, tmp_path):
+    store.get_history("AAPL", days_ago(20), days_ago(10))
+    provider.calls.clear()
+
+    again = store.get_history("AAPL", days_ago(20), days_ago(10))
+    inner = store.get_history("AAPL", days_ago(18), days_ago(12))
+    # A new store instance reads the same files
+    reopened = PriceStore(directory=str(tmp_path / "store"), provider=provider)
+    reopened.get_history("AAPL", days_ago(15), days_ago(11))
+
+    assert provider.calls == []
+    assert list(again.index) == expected_days(days_ago(20), days_ago(10))
+    assert list(inner.index) == expected_days(days_ago(18), days_ago(12))
+
+
+def test_gap_fill_fetches_only_missing_days(store, provider):
+    store.get_history("AAPL", days_ago(20), days_ago(10))
+    provider.calls.clear()
+
+    history = store.get_history("AAPL", days_ago(30), days_ago(5))
+
+    # Older days before the covered range, then the trailing days (the last covered day is refetched)
+    assert provider.calls == [(days_ago(30), days_ago(21)), (days_ago(10), days_ago(5))]
+    assert list(history.index) == expected_days(days_ago(30), days_ago(5))
+    assert history.index.is_unique
+
+
+def test_empty_fetch_of_past_trading_days_is_retried(tmp_path, fixture_dir):
+    provider = RecordingProvider(CsvFixtureProvider(str(fixture_dir)), empty=True)
+    store = PriceStore(directory=str(tmp_path / "store"), provider=provider, empty_retry_seconds=0)
+
+    assert store.get_history("AAPL", days_ago(20), days_ago(10)).empty
+    provider.empty = False
+    history = store.get_history("AAPL", days_ago(20), days_ago(10))
+
+    assert len(provider.calls) == 2
+    assert list(history.index) == expected_days(days_ago(20), days_ago(10))
+
+
+def test_empty_range_is_not_refetched_within_the_retry_delay(tmp_path, fixture_dir):
+    provider = RecordingProvider(CsvFixtureProvider(str(fixture_dir)), empty=True)
+    store = PriceStore(directory=str(tmp_path / "store"), provider=provider, empty_retry_seconds=300)
+
+    store.get_history("AAPL", days_ago(20), days_ago(10))
+    store.get_history("AAPL", days_ago(20), days_ago(10))
+
+    assert len(provider.calls) == 1
+
+
+def test_range_confirmed_empty_twice_is_accepted_as_covered(store, provider):
+    store.empty_retry_seconds = 0
+    store.get_history("AAPL", days_ago(20), days_ago(10))
+    provider.calls.clear()
+    # e.g. a head range that is only a market holiday
+    provider.empty = True
+
+    store.get_history("AAPL", days_ago(25), days_ago(10))
+    store.get_history("AAPL", days_ago(25), days_ago(10))
+    store.get_history("AAPL", days_ago(25), days_ago(10))
+
+    assert provider.calls == [(days_ago(25), days_ago(21))] * 2